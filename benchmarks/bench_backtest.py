@@ -0,0 +1,62 @@
+# Parameter-grid backtest throughput: one combination at a time (recomputing its indicators) vs. the
+# whole grid as columns of one array, and the multi-ticker sweep over a process pool.
+# Run from the repository root: python -m benchmarks.bench_backtest
+import argparse
+import time
+
+import numpy as np
+
+from src.backtest import STRATEGIES, backtest_grid, run_backtest, sweep
+from src.indicators import calculate_sma
+from src.price_store import SyntheticProvider
+
+
+def per_combination(data, fast, slow):
+    # The straightforward loop: indicators and signals rebuilt for every pair
+    close = data['Close'].to_numpy()
+    for f in fast:
+        for s in slow:
+            if f >= s:
+                continue
+            above = (calculate_sma(data, f) > calculate_sma(data, s)).to_numpy()
+            previous = np.concatenate(([False], above[:-1]))
+            run_backtest(close, above & ~previous, ~above & previous)
+
+
+def run(years, tickers, sample, workers):
+    provider = SyntheticProvider()
+    end = f"{2000 + years}-01-01"
+    data = {f"T{i:03d}": provider.download(f"T{i:03d}", "2000-01-01", end) for i in range(tickers)}
+    first = next(iter(data.values()))
+    print(f"{len(first)} bars per ticker ({years} years)")
+
+    fast, slow = list(range(2, 102)), list(range(10, 410, 4))
+    combinations = sum(f < s for f in fast for s in slow)
+    began = time.perf_counter()
+    per_combination(first, fast[:sample], slow[-sample:])
+    looped = (time.perf_counter() - began) / sum(f < s for f in fast[:sample] for s in slow[-sample:])
+    began = time.perf_counter()
+    backtest_grid(first, "sma_cross", {"fast": fast, "slow": slow})
+    vectorized = time.perf_counter() - began
+    print(f"sma_cross, {combinations} combinations on one ticker:")
+    print(f"  per combination {looped * combinations:8.2f}s (extrapolated from {sample * sample} pairs)")
+    print(f"  vectorized      {vectorized:8.2f}s  {combinations / vectorized:8.0f} combinations/s  "
+          f"{looped * combinations / vectorized:5.0f}x")
+
+    grid = STRATEGIES["rsi_threshold"]["grid"]
+    for mode, max_workers in (("inline", 0), ("process pool", workers)):
+        began = time.perf_counter()
+        results = sweep(data, "rsi_threshold", grid, max_workers=max_workers)
+        elapsed = time.perf_counter() - began
+        print(f"rsi_threshold sweep, {tickers} tickers x {len(results) // tickers} combinations ({mode}): "
+              f"{elapsed:.2f}s, {len(results) / elapsed:.0f} combinations/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--tickers", type=int, default=20)
+    parser.add_argument("--sample", type=int, default=10, help="fast x slow pairs timed in the loop")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    run(args.years, args.tickers, args.sample, args.workers)
@@ -0,0 +1,44 @@
+# Compares the strided CCI mean-absolute-deviation against the old rolling().apply(lambda) version.
+# Run from the repository root: python -m benchmarks.bench_cci
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.indicators import rolling_mean_abs_deviation
+
+
+def legacy_mad(tp, window):
+    return tp.rolling(window=window).apply(lambda x: abs(x - x.mean()).mean())
+
+
+def timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        began = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - began)
+    return best, result
+
+
+def run(lengths, windows, repeat):
+    rng = np.random.default_rng(0)
+    print(f"{'length':>8} {'window':>7} {'legacy (ms)':>12} {'strided (ms)':>13} {'speedup':>8} {'max abs diff':>13}")
+    for length in lengths:
+        tp = pd.Series(100 + np.cumsum(rng.normal(0, 1, length)))
+        for window in windows:
+            legacy_time, legacy = timed(lambda: legacy_mad(tp, window), 1)
+            strided_time, strided = timed(lambda: rolling_mean_abs_deviation(tp.values, window), repeat)
+            diff = np.nanmax(np.abs(legacy.values - strided))
+            print(f"{length:>8} {window:>7} {legacy_time * 1000:>12.1f} {strided_time * 1000:>13.2f} "
+                  f"{legacy_time / strided_time:>7.0f}x {diff:>13.2e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--windows", type=int, nargs="+", default=[10, 20, 50, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.lengths, args.windows, args.repeat)
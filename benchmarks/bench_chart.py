@@ -0,0 +1,51 @@
+# Serialized figure size and build time at full resolution vs. downsampled for growing series.
+# Run from the repository root: python -m benchmarks.bench_chart
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.indicators import build_figure, compute_indicators, normalize_indicators
+
+SPECS = ["SMA", "EMA", "Bollinger Bands", "VWAP", "RSI", "MACD", "ROC", "CCI"]
+
+
+def synthetic_bars(length, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, length)))
+    spread = np.abs(rng.normal(0, 0.005, length)) * close
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.002, length)),
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(1_000, 100_000, length).astype("float64")
+    }, index=pd.date_range("2010-01-01", periods=length, freq="h", name="Date"))
+
+
+def measure(data, frame, specs, max_points):
+    began = time.perf_counter()
+    fig = build_figure(data, frame, specs, max_points=max_points)
+    payload = fig.to_json()
+    return len(payload), time.perf_counter() - began
+
+
+def run(lengths, max_points):
+    specs = normalize_indicators(SPECS)
+    print(f"{'bars':>8} {'full (KB)':>10} {'full (s)':>9} {'down (KB)':>10} {'down (s)':>9} {'ratio':>6}")
+    for length in lengths:
+        data = synthetic_bars(length)
+        frame = compute_indicators(data, specs)
+        full_bytes, full_time = measure(data, frame, specs, None)
+        down_bytes, down_time = measure(data, frame, specs, max_points)
+        print(f"{length:>8} {full_bytes / 1024:>10.0f} {full_time:>9.2f} {down_bytes / 1024:>10.0f} "
+              f"{down_time:>9.2f} {full_bytes / down_bytes:>5.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1_000, 10_000, 50_000, 200_000])
+    parser.add_argument("--max-points", type=int, default=1500)
+    args = parser.parse_args()
+    run(args.lengths, args.max_points)
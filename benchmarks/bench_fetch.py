@@ -0,0 +1,35 @@
+# Wall-clock comparison of per-ticker vs batched fetching against a simulated-latency provider.
+# Run from the repository root: python -m benchmarks.bench_fetch
+import argparse
+import time
+
+from src.price_store import PriceStore, SyntheticProvider
+
+
+def run(counts, latency, start, end):
+    print(f"{'tickers':>8} {'sequential (s)':>15} {'batched (s)':>12} {'speedup':>8}")
+    for count in counts:
+        symbols = [f"T{i:04d}" for i in range(count)]
+
+        store = PriceStore(":memory:", SyntheticProvider(latency=latency))
+        began = time.perf_counter()
+        for symbol in symbols:
+            store.get(symbol, start, end)
+        sequential = time.perf_counter() - began
+
+        store = PriceStore(":memory:", SyntheticProvider(latency=latency))
+        began = time.perf_counter()
+        store.get_many(symbols, start, end)
+        batched = time.perf_counter() - began
+
+        print(f"{count:>8} {sequential:>15.3f} {batched:>12.3f} {sequential / batched:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 10, 50, 100, 200])
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per provider round trip")
+    parser.add_argument("--start", default="2023-01-01")
+    parser.add_argument("--end", default="2024-01-01")
+    args = parser.parse_args()
+    run(args.counts, args.latency, args.start, args.end)
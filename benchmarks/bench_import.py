@@ -0,0 +1,98 @@
+# Startup cost from `python -X importtime`: the UI shell (main), the data/chart pipeline behind it
+# (src.views) and the headless screener, each imported in a fresh interpreter. Prints the heaviest
+# packages and exits 1 when an import is over its budget or loads a module that is meant to stay lazy.
+# Run from the repository root: python -m benchmarks.bench_import --budget main=500 src.views=1000 src.screener=500
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use only: the OpenAI SDK on the first analysis, yfinance on the first download,
+# our plotly code when a chart is built (streamlit itself loads plotly's base classes) and pandas,
+# with the rest of the pipeline, after the sidebar is drawn
+LAZY = {
+    "main": ["openai", "yfinance", "plotly.subplots", "pandas"],
+    "src.views": ["openai", "yfinance", "plotly.subplots"],
+    "src.screener": ["openai", "yfinance", "plotly", "streamlit"]
+}
+
+
+def import_times(module):
+    # [(self µs, cumulative µs, depth, name)] for one import in a fresh interpreter
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((int(own), int(cumulative), depth, name.strip()))
+    return entries
+
+
+def measure(module, repeat):
+    # The fastest of repeat runs; the module's own top-level entry holds the total
+    runs = [import_times(module) for _ in range(repeat)]
+    best = min(runs, key=lambda entries: next(e[1] for e in entries if e[3] == module and e[2] == 0))
+    total = next(e[1] for e in best if e[3] == module and e[2] == 0)
+    return total, best
+
+
+def by_package(entries):
+    packages = defaultdict(int)
+    for own, _, _, name in entries:
+        packages[name.split(".")[0]] += own
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+
+def run(modules, repeat, top, budgets):
+    failures = []
+    for module in modules:
+        try:
+            total, entries = measure(module, repeat)
+        except RuntimeError as e:
+            print(f"import {module} failed: {e}\n")
+            failures.append(module)
+            continue
+        loaded = {entry[3] for entry in entries}
+        budget = budgets.get(module)
+        status = "" if budget is None else (f"  budget {budget:.0f} ms" + ("  OVER" if total / 1000 > budget else ""))
+        print(f"import {module}: {total / 1000:.0f} ms{status}")
+        for package, own in by_package(entries)[:top]:
+            print(f"  {package:<24} {own / 1000:>8.1f} ms")
+        eager = [name for name in LAZY.get(module, []) if name in loaded]
+        if eager:
+            print(f"  loaded eagerly: {', '.join(eager)}")
+            failures.append(module)
+        if budget is not None and total / 1000 > budget:
+            failures.append(module)
+        print()
+    return failures
+
+
+def parse_budgets(items):
+    budgets = {}
+    for item in items:
+        module, _, ms = item.partition("=")
+        budgets[module] = float(ms)
+    return budgets
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", nargs="+", default=list(LAZY))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8, help="heaviest packages listed per import")
+    parser.add_argument("--budget", nargs="*", default=["main=500", "src.views=1000", "src.screener=500"],
+                        help="module=milliseconds; the fastest run must stay within it")
+    args = parser.parse_args()
+    if run(args.modules, args.repeat, args.top, parse_budgets(args.budget)):
+        sys.exit(1)
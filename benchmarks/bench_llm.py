@@ -0,0 +1,44 @@
+# Sequential vs concurrent analysis of many tickers against a latency-injecting local LLM stub.
+# Run from the repository root: python -m benchmarks.bench_llm
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.stub_llm_server import start_stub_server
+
+
+def run(count, latency, rate_limit_every):
+    server, url = start_stub_server(latency=latency, rate_limit_every=rate_limit_every)
+    # Must be set before src.config is imported; a fresh cache directory keeps every call a miss
+    os.environ["OPENROUTER_BASE_URL"] = url
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+    os.environ["LLM_CACHE_DIR"] = tempfile.mkdtemp()
+    from src.analysis import analyze_many, analyze_with_llm
+
+    summaries = {f"T{i:03d}": f'{{"run":"sequential","ticker":{i}}}' for i in range(count)}
+    began = time.perf_counter()
+    for ticker, summary in summaries.items():
+        analyze_with_llm(ticker, summary)
+    sequential = time.perf_counter() - began
+
+    summaries = {f"T{i:03d}": f'{{"run":"concurrent","ticker":{i}}}' for i in range(count)}
+    began = time.perf_counter()
+    first = None
+    for ticker, result in analyze_many(summaries):
+        first = first or time.perf_counter() - began
+    concurrent = time.perf_counter() - began
+
+    print(f"tickers={count} latency={latency:.2f}s upstream requests={server.requests}")
+    print(f"sequential: {sequential:.2f}s")
+    print(f"concurrent: {concurrent:.2f}s (first result after {first:.2f}s, {concurrent / latency:.1f}x per-call latency)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds the stub waits before replying")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="stub answers every Nth request with 429")
+    args = parser.parse_args()
+    run(args.tickers, args.latency, args.rate_limit_every)
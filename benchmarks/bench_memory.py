@@ -0,0 +1,71 @@
+# Memory held per Streamlit session for the same tickers and range: a private float64 frame per
+# session (the old behaviour) vs. shared float32 frames from fetch_stock_data, plus the cost of the
+# full indicator summary serialized through Python lists vs. straight from the arrays.
+# Run from the repository root: python -m benchmarks.bench_memory
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from src.data_fetcher import fetch_stock_data
+from src.indicators import INDICATORS, compute_indicators, normalize_indicators, summarize_indicators
+from src.price_store import PriceStore, SyntheticProvider
+
+
+def retained(build):
+    # Bytes still allocated after build() returns, for as long as its result is held
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, held
+
+
+def legacy_summary(frame):
+    return json.dumps({column: frame[column].values.tolist() for column in frame.columns})
+
+
+def profile(func):
+    tracemalloc.start()
+    began = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - began
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def run(sessions, tickers, start, end):
+    path = os.path.join(tempfile.mkdtemp(), "prices.sqlite")
+    symbols = [f"T{i:03d}" for i in range(tickers)]
+    PriceStore(path, SyntheticProvider()).get_many(symbols, start, end)  # Fill the store once
+
+    store = PriceStore(path, dtype="float64")
+    before, _ = retained(lambda: [{s: store.read(s, start, end) for s in symbols} for _ in range(sessions)])
+    store = PriceStore(path, dtype="float32")
+    after, held = retained(lambda: [fetch_stock_data(symbols, start, end, store=store) for _ in range(sessions)])
+    bars = len(next(iter(held[0].values())))
+
+    print(f"{sessions} sessions x {tickers} tickers x {bars} bars")
+    print(f"{'':>28} {'total (MB)':>11} {'per session (MB)':>17}")
+    print(f"{'private float64 frames':>28} {before / 1e6:>11.2f} {before / sessions / 1e6:>17.3f}")
+    print(f"{'shared float32 frames':>28} {after / 1e6:>11.2f} {after / sessions / 1e6:>17.3f}")
+
+    frame = compute_indicators(held[0][symbols[0]], normalize_indicators(list(INDICATORS)))
+    print(f"\nfull indicator summary, {frame.size} values:")
+    for name, func in (("via Python lists", legacy_summary), ("from arrays", summarize_indicators)):
+        elapsed, peak = profile(lambda: func(frame))
+        print(f"{name:>28} {elapsed * 1000:>8.1f} ms  peak {peak / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--tickers", type=int, default=10)
+    parser.add_argument("--start", default="2014-01-01")
+    parser.add_argument("--end", default="2024-01-01")
+    args = parser.parse_args()
+    run(args.sessions, args.tickers, args.start, args.end)
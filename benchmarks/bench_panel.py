@@ -0,0 +1,57 @@
+# Every registered indicator over a universe: compute_indicators per ticker vs. one panel pass.
+# Tickers get different listing dates and some skip bars, as on another exchange calendar.
+# Run from the repository root: python -m benchmarks.bench_panel
+import argparse
+import time
+
+import numpy as np
+
+from src.indicators import INDICATORS, compute_indicators, normalize_indicators
+from src.panel import Panel, compute_panel
+from src.price_store import SyntheticProvider
+
+
+def universe(count, years, seed=0):
+    provider = SyntheticProvider()
+    rng = np.random.default_rng(seed)
+    end = f"{2000 + years}-01-01"
+    data = {}
+    for i in range(count):
+        frame = provider.download(f"T{i:04d}", "2000-01-01", end)
+        frame = frame.iloc[rng.integers(0, len(frame) // 2):]
+        if i % 4 == 0:
+            frame = frame[rng.random(len(frame)) > 0.03]
+        data[f"T{i:04d}"] = frame
+    return data
+
+
+def run(counts, years):
+    specs = normalize_indicators(list(INDICATORS))
+    print(f"{'tickers':>8} {'per ticker (s)':>15} {'panel (s)':>10} {'speedup':>8} {'max rel diff':>13}")
+    for count in counts:
+        data = universe(count, years)
+
+        began = time.perf_counter()
+        expected = {ticker: compute_indicators(frame, specs) for ticker, frame in data.items()}
+        looped = time.perf_counter() - began
+
+        began = time.perf_counter()
+        panel = Panel(data)
+        frames = compute_panel(panel, specs)
+        vectorized = time.perf_counter() - began
+
+        diff = 0.0
+        for ticker, reference in expected.items():
+            result = panel.ticker_frame(frames, ticker)[reference.columns].to_numpy()
+            reference = reference.to_numpy()
+            assert (np.isnan(result) == np.isnan(reference)).all(), ticker
+            diff = max(diff, np.nanmax(np.abs(result - reference) / np.maximum(1, np.abs(reference))))
+        print(f"{count:>8} {looped:>15.3f} {vectorized:>10.3f} {looped / vectorized:>7.1f}x {diff:>13.2e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+    run(args.counts, args.years)
@@ -0,0 +1,92 @@
+# First page load of popular tickers in a fresh app worker: cold (empty store and caches) vs. warmed
+# by a prefetch run in another process through the shared SQLite tier, plus a repeat load in the same
+# worker (in-memory hit). The provider sleeps to stand in for the network.
+# Run from the repository root: python -m benchmarks.bench_prefetch
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+
+def open_store(latency):
+    from src.config import PRICE_STORE_PATH, PRICE_DTYPE
+    from src.price_store import PriceStore, SyntheticProvider
+    return PriceStore(PRICE_STORE_PATH, SyntheticProvider(latency=latency), dtype=PRICE_DTYPE)
+
+
+def page_loads(tickers, latency, repeat):
+    # What main.py does for a new session, per ticker: fetch, then the chart and digest
+    from src.data_fetcher import fetch_stock_data
+    from src.indicators import calculate_indicators
+    from src.profiling import metrics
+    store = open_store(latency)
+    end = date.today()
+    start = end - timedelta(days=365)
+    timings = []
+    for _ in range(repeat):
+        for ticker in tickers:
+            began = time.perf_counter()
+            data = fetch_stock_data([ticker], start, end, store=store)[ticker]
+            calculate_indicators(data, [], {}, ticker, "Daily")
+            timings.append(time.perf_counter() - began)
+    return timings, metrics.snapshot()["spans"]
+
+
+def prefetch(tickers, latency):
+    from src.prefetch import warm
+    began = time.perf_counter()
+    warm("US Stocks", tickers, settled=date.today() + timedelta(days=1), store=open_store(latency))
+    return time.perf_counter() - began
+
+
+def in_worker(func, *args):
+    # A fresh interpreter, so nothing carries over in memory from earlier scenarios
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(func, *args).result()
+
+
+def use_directory(path):
+    os.environ["PRICE_STORE_PATH"] = os.path.join(path, "prices.sqlite")
+    os.environ["SHARED_CACHE_PATH"] = os.path.join(path, "shared.sqlite")
+
+
+def report(name, timings):
+    print(f"{name:<28} {statistics.mean(timings) * 1000:>9.1f} {statistics.median(timings) * 1000:>9.1f} "
+          f"{max(timings) * 1000:>9.1f}")
+
+
+def run(count, latency):
+    tickers = [f"T{i:03d}" for i in range(count)]
+
+    use_directory(tempfile.mkdtemp())
+    cold, cold_spans = in_worker(page_loads, tickers, latency, 1)
+
+    use_directory(tempfile.mkdtemp())
+    elapsed = in_worker(prefetch, tickers, latency)
+    loads, warm_spans = in_worker(page_loads, tickers, latency, 2)
+    warm, repeat = loads[:count], loads[count:]
+
+    print(f"{count} tickers, provider latency {latency * 1000:.0f} ms; prefetch run took {elapsed:.2f}s")
+    print(f"{'first page load per ticker':<28} {'mean (ms)':>9} {'p50 (ms)':>9} {'max (ms)':>9}")
+    report("cold miss", cold)
+    report("warm hit (shared tier)", warm)
+    report("repeat (in memory)", repeat)
+
+    print("\ncalculate_indicators only:")
+    for name, spans in (("cold worker", cold_spans), ("warmed worker", warm_spans)):
+        for kind in ("indicators.cold_miss", "indicators.warm_hit"):
+            if kind in spans:
+                entry = spans[kind]
+                print(f"  {name:<14} {kind:<22} {entry['count']:>4} calls {entry['total'] / entry['count'] * 1000:>8.2f} ms mean")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per provider request")
+    args = parser.parse_args()
+    run(args.tickers, args.latency)
@@ -0,0 +1,62 @@
+# Rerun latency of the Streamlit app with every tab rendered vs. only the selected view.
+# Runs the app headlessly through streamlit.testing with synthetic prices, one subprocess per mode.
+# Run from the repository root: python -m benchmarks.bench_rerun
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+INDICATORS = [
+    {"id": str(i), "type": kind, "params": {}, "display_name": kind}
+    for i, kind in enumerate(["SMA", "EMA", "Bollinger Bands", "RSI", "MACD", "CCI"])
+]
+
+
+def measure(tickers, reruns):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(os.getcwd(), "main.py"), default_timeout=600)
+    app.session_state["indicators"] = INDICATORS
+    app.session_state["indicator_params"] = {}
+    app.run()
+    began = time.perf_counter()
+    app.sidebar.text_input[0].input(", ".join(tickers)).run()
+    first = time.perf_counter() - began
+    timings = []
+    for _ in range(reruns):
+        began = time.perf_counter()
+        app.run()
+        timings.append(time.perf_counter() - began)
+    return {"first": first, "rerun": min(timings), "errors": [str(e.value) for e in app.exception]}
+
+
+def run(counts, reruns):
+    print(f"{'tickers':>8} {'mode':>6} {'first load (s)':>15} {'rerun (s)':>10}")
+    for count in counts:
+        for lazy in ("0", "1"):
+            env = dict(os.environ, LAZY_TABS=lazy, PRICE_PROVIDER="synthetic",
+                       PRICE_STORE_PATH=os.path.join(tempfile.mkdtemp(), "prices.sqlite"))
+            env.setdefault("OPENROUTER_API_KEY", "benchmark")
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_rerun", "--child", str(count), "--reruns", str(reruns)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            mode = "lazy" if lazy == "1" else "eager"
+            print(f"{count:>8} {mode:>6} {result['first']:>15.2f} {result['rerun']:>10.2f}"
+                  + (f"  errors: {result['errors']}" if result["errors"] else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs="+", default=[5, 15, 30])
+    parser.add_argument("--reruns", type=int, default=3)
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(measure([f"T{i:03d}" for i in range(args.child)], args.reruns)))
+    else:
+        run(args.counts, args.reruns)
@@ -0,0 +1,108 @@
+# Regression suite: every indicator, the figure, the digest and the end-to-end pipeline over
+# synthetic OHLCV of increasing size. Save a run as the baseline, then compare later runs against it:
+#   python -m benchmarks.bench_suite --output baseline.json
+#   python -m benchmarks.bench_suite --compare baseline.json   (exits 1 on a regression)
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+
+from benchmarks.bench_chart import synthetic_bars
+from src.indicators import (
+    INDICATORS, build_figure, calculate_indicators, compute_indicators, digest_indicators, indicator_cache,
+    normalize_indicators
+)
+from src.profiling import metrics
+
+SPECS = normalize_indicators(list(INDICATORS))
+
+
+def cases(data):
+    # name -> zero-argument callable; the pipeline clears the shared cache so every call is cold
+    frame = compute_indicators(data, SPECS)
+    items = {
+        f"indicator.{name}": (lambda entry=entry: entry["func"](data, **entry["defaults"]))
+        for name, entry in INDICATORS.items()
+    }
+    items["compute_indicators"] = lambda: compute_indicators(data, SPECS)
+    items["build_figure"] = lambda: build_figure(data, frame, SPECS, max_points=1500)
+    items["digest"] = lambda: digest_indicators(data, frame, SPECS)
+
+    def pipeline():
+        indicator_cache.clear()
+        calculate_indicators(data, list(INDICATORS), {})
+    items["pipeline"] = pipeline
+    return items
+
+
+def measure(func, repeat):
+    func()  # Warm-up
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            began = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - began)
+        finally:
+            gc.enable()
+    return {"min": min(timings), "median": statistics.median(timings), "rounds": repeat}
+
+
+def run(sizes, repeat, only):
+    results = {}
+    for bars in sizes:
+        # Hourly bars: 100k daily bars would run past the last date datetime64[ns] can hold (2262)
+        data = synthetic_bars(bars)
+        for name, func in cases(data).items():
+            if only and not any(part in name for part in only):
+                continue
+            key = f"{name}[{bars}]"
+            results[key] = measure(func, repeat)
+            print(f"{key:<40} {results[key]['min'] * 1000:>10.2f} ms  (median {results[key]['median'] * 1000:.2f})")
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"\n{'case':<40} {'baseline (ms)':>14} {'now (ms)':>10} {'change':>8}")
+    for key, entry in results.items():
+        if key not in baseline:
+            continue
+        before, now = baseline[key]["min"], entry["min"]
+        change = now / before - 1
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{key:<40} {before * 1000:>14.2f} {now * 1000:>10.2f} {change:>+7.0%}{flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="run only the cases whose name contains one of these")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --output")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before failing")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, args.only)
+    stages = metrics.snapshot()["spans"]
+    print("\npipeline stages (all runs):")
+    for name, entry in stages.items():
+        print(f"  {name:<24} {entry['count']:>5} calls {entry['total'] / entry['count'] * 1000:>10.2f} ms mean")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": sys.version, "machine": platform.machine(), "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
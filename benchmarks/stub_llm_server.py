@@ -0,0 +1,99 @@
+# Minimal OpenAI-compatible chat completions endpoint for exercising the LLM path offline.
+# Run standalone with: python -m benchmarks.stub_llm_server --port 8001 --latency 0.5
+# then point the app at it with OPENROUTER_BASE_URL=http://127.0.0.1:8001/v1
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = {
+    "action": "Hold",
+    "justification": "Stub analysis: momentum is \"mixed\", RSI sits near 50 and price hugs the 20-day SMA.\nNo clear trend."
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, count, model):
+        # Server-sent events in the OpenAI chunk format, a few characters per event
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        content = json.dumps(REPLY)
+        for start in range(0, len(content), 8):
+            chunk = {
+                "id": f"stub-{count}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[start:start + 8]}, "finish_reason": None}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.server.chunk_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            count = server.requests
+        if server.rate_limit_every and count % server.rate_limit_every == 0:
+            self._send_json(429, {"error": {"message": "Rate limited by stub", "type": "rate_limit"}})
+            return
+        time.sleep(server.latency)
+        if request.get("stream"):
+            self._send_stream(count, request.get("model", "stub"))
+            return
+        self._send_json(200, {
+            "id": f"stub-{count}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(REPLY)},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        })
+
+
+def start_stub_server(latency=0.0, port=0, rate_limit_every=0, chunk_delay=0.02):
+    # Serves in a daemon thread; returns the server (with .requests) and its base URL
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.chunk_delay = chunk_delay
+    server.rate_limit_every = rate_limit_every
+    server.requests = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds before each reply")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth request with 429")
+    args = parser.parse_args()
+    server, url = start_stub_server(args.latency, args.port, args.rate_limit_every)
+    print(f"Stub LLM endpoint listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,13 +1,36 @@
 import json
-from src.config import client, MODEL_NAME, LANGUAGES
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from src.cache import LRUCache, make_key
+from src.config import (
+    get_client, MODEL_NAME, LANGUAGES, LLM_CACHE_ENTRIES, LLM_CACHE_TTL, LLM_CACHE_DIR,
+    LLM_MAX_CONCURRENCY, LLM_RETRIES
+)
+from src.digest import estimate_tokens
+from src.profiling import metrics, span
+from src.utils import with_retry
 
-def analyze_with_llm(ticker, indicators_summary, language="English"):
+logger = logging.getLogger(__name__)
+
+# Parsed results keyed by model + prompt, shared by every session and persisted between restarts
+response_cache = LRUCache(max_entries=LLM_CACHE_ENTRIES, ttl=LLM_CACHE_TTL, path=LLM_CACHE_DIR)
+_inflight = {}
+_inflight_lock = threading.Lock()
+_llm_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+metrics.register("llm_cache", response_cache.info)
+
+def build_prompt(ticker, indicators_summary, language="English"):
     # Update prompt asking for a detailed justification of technical analysis and recommendations
     lang_code = LANGUAGES.get(language, "en")
-    
-    analysis_prompt = (
+
+    return (
         f"You are a Stock Trader specializing in Technical Analysis at a top financial institution. "
-        f"Here is the summary of technical indicators for {ticker}:\n\n{indicators_summary}"
+        f"Here is a compact digest of the technical indicators for {ticker}: latest values, the most recent "
+        f"values (oldest to newest), extremes with dates, trend slope in % per bar and the latest crossovers:\n\n"
+        f"{indicators_summary}\n\n"
         f"Provide a detailed justification of your analysis in {language}, explaining what patterns, signals, and trends you observe. "
         f"Then, based analysis results, provide a recommendation from the following options: "
         f"'Strong Buy', 'Buy', 'Weak Buy', 'Hold', 'Weak Sell', 'Sell', or 'Strong Sell'. "
@@ -15,19 +38,8 @@ def analyze_with_llm(ticker, indicators_summary, language="English"):
         f"IMPORTANT: Respond in {language} language (code: {lang_code})."
     )
 
-    # Call the LLM with the image part and the analysis prompt
-    contents = [
-        {'role': 'user', 'content': analysis_prompt}
-    ]
-
-    response = client.chat.completions.create(
-        model=MODEL_NAME,
-        messages=contents,
-    )
-
+def parse_llm_response(result_text):
     try:
-        result_text = response.choices[0].message.content
-        print(result_text)
         json_start_index = result_text.index('{')
         json_end_index = result_text.rindex('}') + 1
 
@@ -39,16 +51,225 @@ def analyze_with_llm(ticker, indicators_summary, language="English"):
     except json.JSONDecodeError as e:
         result = {
             "action": "Error",
-            "justification": f"JSON Parsing error: {e}. Raw response text: {response.choices[0].message.content}"
+            "justification": f"JSON Parsing error: {e}. Raw response text: {result_text}"
         }
     except ValueError as ve:
         result = {
             "action": "Error",
-            "justification": f"Value Error: {ve}. Raw response text: {response.choices[0].message.content}"
+            "justification": f"Value Error: {ve}. Raw response text: {result_text}"
         }
     except Exception as e:
         result = {
             "action": "Error",
-            "justification": f"General Error: {e}. Raw response text: {response.choices[0].message.content}"
+            "justification": f"General Error: {e}. Raw response text: {result_text}"
         }
     return result
+
+class JustificationExtractor:
+    # Pulls the decoded "justification" string out of a JSON answer that arrives in arbitrary chunks
+    KEY = re.compile(r'"justification"\s*:\s*"')
+    ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+    def __init__(self):
+        self.buffer = ""
+        self.position = None  # Index of the next undecoded character of the value
+        self.done = False
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        if self.done:
+            return ""
+        if self.position is None:
+            match = self.KEY.search(self.buffer)
+            if not match:
+                return ""
+            self.position = match.end()
+
+        out = []
+        i, buffer = self.position, self.buffer
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self.done = True
+                i += 1
+                break
+            if char != '\\':
+                out.append(char)
+                i += 1
+                continue
+            if i + 1 >= len(buffer):
+                break  # Escape split across chunks; wait for the rest
+            code = buffer[i + 1]
+            if code != 'u':
+                out.append(self.ESCAPES.get(code, code))
+                i += 2
+                continue
+            # \uXXXX, possibly a surrogate pair spanning two escapes
+            length = 12 if buffer[i + 2:i + 4].lower() in ("d8", "d9", "da", "db") else 6
+            if i + length > len(buffer):
+                break
+            try:
+                out.append(json.loads(f'"{buffer[i:i + length]}"'))
+            except json.JSONDecodeError:
+                out.append(buffer[i:i + length])
+            i += length
+        self.position = i
+        return "".join(out)
+
+class AnalysisStream:
+    # Iterate to receive justification text as the model produces it; .result holds the parsed answer afterwards
+    def __init__(self, ticker, indicators_summary, language="English"):
+        self.ticker = ticker
+        self.prompt = build_prompt(ticker, indicators_summary, language)
+        self.key = make_key(MODEL_NAME, self.prompt)
+        self.result = None
+        self.time_to_first_token = None
+
+    def __iter__(self):
+        cached = response_cache.get(self.key)
+        if cached is not None:
+            self.result = cached
+            yield cached.get("justification", "No justification provided.")
+            return
+
+        # Share one upstream call with identical requests in flight, streamed or not (see analyze_with_llm);
+        # a duplicate waits for the owner and gets the justification in one piece
+        with _inflight_lock:
+            future = _inflight.get(self.key)
+            owner = future is None
+            if owner:
+                future = Future()
+                _inflight[self.key] = future
+        if not owner:
+            metrics.increment("llm_coalesced")
+            self.result = future.result()
+            yield self.result.get("justification", "No justification provided.")
+            return
+
+        try:
+            yield from self._stream()
+            future.set_result(self.result)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with _inflight_lock:
+                _inflight.pop(self.key, None)
+            if not future.done():
+                # The consumer stopped iterating before the answer was complete
+                future.set_exception(RuntimeError(f"Analysis stream for {self.ticker} was closed early"))
+
+    def _stream(self):
+        contents = [
+            {'role': 'user', 'content': self.prompt}
+        ]
+        extractor = JustificationExtractor()
+        parts = []
+        emitted = False
+        started = time.perf_counter()
+        client = get_client()
+        from openai import RateLimitError  # Loaded with the client
+        with _llm_slots:
+            stream = with_retry(
+                lambda: client.chat.completions.create(
+                    model=MODEL_NAME,
+                    messages=contents,
+                    stream=True,
+                ),
+                attempts=LLM_RETRIES, backoff=1.0, retry_on=(RateLimitError,)
+            )
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if self.time_to_first_token is None:
+                    self.time_to_first_token = time.perf_counter() - started
+                    metrics.observe("llm.first_token", self.time_to_first_token)
+                    logger.info("Time to first token for %s: %.3fs", self.ticker, self.time_to_first_token)
+                parts.append(delta)
+                text = extractor.feed(delta)
+                if text:
+                    emitted = True
+                    yield text
+
+        result_text = "".join(parts)
+        logger.debug("Raw response for %s: %s", self.ticker, result_text)
+        self.result = parse_llm_response(result_text)
+        metrics.observe("llm.stream", time.perf_counter() - started)
+        logger.info("Streamed analysis for %s in %.3fs", self.ticker, time.perf_counter() - started)
+        if self.result.get("action") != "Error":
+            response_cache.set(self.key, self.result)
+        if not emitted:
+            # The answer was not the expected JSON; show whatever parse_llm_response made of it
+            yield self.result.get("justification", "No justification provided.")
+
+def _request_analysis(prompt):
+    # Call the LLM with the analysis prompt
+    contents = [
+        {'role': 'user', 'content': prompt}
+    ]
+
+    client = get_client()
+    from openai import RateLimitError  # Loaded with the client
+
+    def create():
+        # Concurrency is capped process-wide so many sessions cannot flood the provider
+        with _llm_slots:
+            return client.chat.completions.create(
+                model=MODEL_NAME,
+                messages=contents,
+            )
+
+    with span("llm.request"):
+        response = with_retry(create, attempts=LLM_RETRIES, backoff=1.0, retry_on=(RateLimitError,))
+    result_text = response.choices[0].message.content
+    logger.debug("Raw response: %s", result_text)
+    return parse_llm_response(result_text)
+
+def analyze_with_llm(ticker, indicators_summary, language="English"):
+    analysis_prompt = build_prompt(ticker, indicators_summary, language)
+    logger.info("Prompt for %s: %d chars (~%d tokens)", ticker, len(analysis_prompt), estimate_tokens(analysis_prompt))
+
+    key = make_key(MODEL_NAME, analysis_prompt)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Identical requests already in flight (e.g. from another session) share a single call
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[key] = future
+    if not owner:
+        metrics.increment("llm_coalesced")
+        return future.result()
+
+    try:
+        result = _request_analysis(analysis_prompt)
+        if result.get("action") != "Error":
+            response_cache.set(key, result)
+        future.set_result(result)
+        return result
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+def analyze_many(summaries, language="English", max_workers=LLM_MAX_CONCURRENCY):
+    # Fans analyze_with_llm out over {ticker: indicator_summary} and yields (ticker, result) as each completes
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        jobs = {
+            pool.submit(analyze_with_llm, ticker, summary, language): ticker
+            for ticker, summary in summaries.items()
+        }
+        for job in as_completed(jobs):
+            ticker = jobs[job]
+            try:
+                result = job.result()
+            except Exception as e:
+                result = {"action": "Error", "justification": f"Request failed: {e}"}
+            yield ticker, result
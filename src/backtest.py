@@ -0,0 +1,230 @@
+# Vectorized backtests of indicator signals. Every parameter combination is one column of a
+# (bars, combinations) array, so a whole grid is evaluated with a handful of NumPy passes.
+# Run from the repository root: python -m src.backtest universe.txt --strategy sma_cross
+import argparse
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.config import PRICE_STORE_PATH, PRICE_PROVIDER
+from src.indicators import calculate_rsi, calculate_sma
+from src.price_store import PriceStore, SyntheticProvider
+from src.screener import fetch_universe, read_universe, write_table
+from src.timeframes import TIMEFRAMES, resample_ohlcv
+
+logger = logging.getLogger(__name__)
+
+METRICS = ["total_return", "sharpe", "max_drawdown", "trades", "win_rate", "exposure"]
+PERIODS_PER_YEAR = {"Daily": 252, "Weekly": 52, "Monthly": 12}
+
+
+def positions_from_signals(entries, exits):
+    # Long/flat state after each bar's close: an entry goes long, an exit goes flat, otherwise the
+    # previous state carries forward; an exit on the same bar as an entry wins
+    rows = np.where(entries | exits, np.arange(len(entries), dtype="int32")[:, None], np.int32(0))
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return np.take_along_axis(entries & ~exits, rows, axis=0)
+
+
+def run_backtest(close, entries, exits, fee=0.0005, slippage=0.0005, periods_per_year=252):
+    # close: (bars,); entries/exits: (bars,) or (bars, combinations) booleans decided at each close.
+    # Positions are held from the next bar on, and every change of position pays fee + slippage.
+    # Returns one row of METRICS per combination.
+    close = np.asarray(close, dtype="float64")
+    entries, exits = np.atleast_1d(entries), np.atleast_1d(exits)
+    if entries.ndim == 1:
+        entries, exits = entries[:, None], exits[:, None]
+    bars, combinations = entries.shape
+
+    held = np.zeros((bars, combinations), dtype=bool)
+    held[1:] = positions_from_signals(entries, exits)[:-1]
+    changes = np.zeros_like(held)
+    np.not_equal(held[1:], held[:-1], out=changes[1:])
+    market = np.zeros(bars)
+    market[1:] = close[1:] / close[:-1] - 1
+    returns = held * market[:, None]
+    returns -= changes * (fee + slippage)
+
+    std = returns[1:].std(axis=0, ddof=1) if bars > 2 else np.zeros(combinations)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, returns[1:].mean(axis=0) / std * np.sqrt(periods_per_year), np.nan)
+    equity = returns
+    equity += 1
+    np.cumprod(equity, axis=0, out=equity)
+    peak = np.maximum.accumulate(equity, axis=0)
+    np.divide(equity, peak, out=peak)
+
+    # Equity is flat while out of the market, so a trade's return (exit costs included) is the equity
+    # just before the next entry, or at the end, over the equity just before its own entry
+    columns, rows = np.nonzero((held[1:] & ~held[:-1]).T)
+    rows += 1
+    same_column = np.append(columns[1:] == columns[:-1], False)
+    ends = np.where(same_column, np.append(rows[1:], bars) - 1, bars - 1)
+    trade_returns = equity[ends, columns] / equity[rows - 1, columns] - 1
+    trade_counts = np.bincount(columns, minlength=combinations)
+    wins = np.bincount(columns, weights=trade_returns > 0, minlength=combinations)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_rate = np.where(trade_counts > 0, wins / trade_counts, np.nan)
+    return pd.DataFrame({
+        "total_return": equity[-1] - 1,
+        "sharpe": sharpe,
+        "max_drawdown": 1 - peak.min(axis=0),
+        "trades": trade_counts,
+        "win_rate": win_rate,
+        "exposure": held.mean(axis=0)
+    })
+
+
+def _crossings(above):
+    previous = np.zeros_like(above)
+    previous[1:] = above[:-1]
+    return above & ~previous, ~above & previous
+
+
+def sma_cross(data, fast, slow):
+    # Long while the fast SMA is above the slow one; one column per fast < slow pair
+    periods = sorted(set(fast) | set(slow))
+    lines = np.column_stack([calculate_sma(data, period).to_numpy(dtype="float64") for period in periods])
+    column = {period: i for i, period in enumerate(periods)}
+    combinations = pd.DataFrame([(f, s) for f in fast for s in slow if f < s], columns=["fast", "slow"])
+    fast_column = combinations["fast"].map(column).to_numpy()
+    slow_column = combinations["slow"].map(column).to_numpy()
+
+    def signals(columns):
+        with np.errstate(invalid="ignore"):
+            return _crossings(lines[:, fast_column[columns]] > lines[:, slow_column[columns]])
+    return combinations, signals
+
+
+def rsi_threshold(data, period, lower, upper):
+    # Buy when RSI drops below lower, sell when it rises above upper
+    periods = sorted(set(period))
+    lines = np.column_stack([calculate_rsi(data, p).to_numpy(dtype="float64") for p in periods])
+    column = {p: i for i, p in enumerate(periods)}
+    combinations = pd.DataFrame(
+        [(p, lo, up) for p in period for lo in lower for up in upper if lo < up],
+        columns=["period", "lower", "upper"]
+    )
+    rsi_column = combinations["period"].map(column).to_numpy()
+    lower_levels = combinations["lower"].to_numpy(dtype="float64")
+    upper_levels = combinations["upper"].to_numpy(dtype="float64")
+
+    def signals(columns):
+        rsi = lines[:, rsi_column[columns]]
+        with np.errstate(invalid="ignore"):
+            return rsi < lower_levels[columns], rsi > upper_levels[columns]
+    return combinations, signals
+
+
+# Strategy name -> signal builder and the default parameter grid it is swept over. A builder takes
+# the OHLCV frame plus one list per parameter and returns (combinations frame, signals(columns))
+STRATEGIES = {
+    "sma_cross": {
+        "func": sma_cross,
+        "grid": {"fast": list(range(5, 55, 5)), "slow": list(range(20, 260, 10))}
+    },
+    "rsi_threshold": {
+        "func": rsi_threshold,
+        "grid": {"period": [7, 14, 21, 28], "lower": list(range(10, 50, 5)), "upper": list(range(55, 95, 5))}
+    }
+}
+
+
+def backtest_grid(data, strategy, grid=None, fee=0.0005, slippage=0.0005, periods_per_year=252,
+                  max_block=1 << 20):
+    # One row per parameter combination; columns are evaluated in blocks of at most max_block cells
+    grid = grid or STRATEGIES[strategy]["grid"]
+    combinations, signals = STRATEGIES[strategy]["func"](data, **grid)
+    close = data['Close'].to_numpy(dtype="float64")
+    step = max(1, max_block // max(1, len(close)))
+    results = []
+    for start in range(0, len(combinations), step):
+        columns = np.arange(start, min(start + step, len(combinations)))
+        entries, exits = signals(columns)
+        results.append(run_backtest(close, entries, exits, fee, slippage, periods_per_year))
+    metrics = pd.concat(results, ignore_index=True) if results else pd.DataFrame(columns=METRICS)
+    return pd.concat([combinations, metrics], axis=1)
+
+
+def _backtest_ticker(job):
+    ticker, data, strategy, grid, fee, slippage, periods_per_year = job
+    result = backtest_grid(data, strategy, grid, fee, slippage, periods_per_year)
+    result.insert(0, "ticker", ticker)
+    return result
+
+
+def sweep(data, strategy, grid=None, fee=0.0005, slippage=0.0005, periods_per_year=252, max_workers=None):
+    # Grids are vectorized per ticker; tickers are spread over worker processes (0 runs inline)
+    jobs = [(ticker, frame, strategy, grid, fee, slippage, periods_per_year) for ticker, frame in data.items()]
+    if max_workers == 0:
+        results = list(map(_backtest_ticker, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_backtest_ticker, jobs))
+    return pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+
+
+def _parse_grid(values):
+    # name=v1,v2,... or name=start:stop:step
+    grid = {}
+    for value in values or []:
+        name, spec = value.split("=", 1)
+        if ":" in spec:
+            grid[name] = list(range(*(int(part) for part in spec.split(":"))))
+        else:
+            grid[name] = [int(part) for part in spec.split(",")]
+    return grid
+
+
+def main(argv=None):
+    today = datetime.now().date()
+    parser = argparse.ArgumentParser(description="Backtest indicator strategies over a parameter grid.")
+    parser.add_argument("universe", help="file with one ticker per line (or comma separated)")
+    parser.add_argument("--strategy", choices=list(STRATEGIES), default="sma_cross")
+    parser.add_argument("--grid", nargs="*", help="override a parameter, e.g. fast=5:55:5 slow=50,100,200")
+    parser.add_argument("--fee", type=float, default=0.0005, help="fraction of notional per trade side")
+    parser.add_argument("--slippage", type=float, default=0.0005, help="fraction of notional per trade side")
+    parser.add_argument("--market", choices=["US Stocks", "TW Stocks"], default="US Stocks")
+    parser.add_argument("--start", default=str(today - timedelta(days=365 * 10)))
+    parser.add_argument("--end", default=str(today))
+    parser.add_argument("--timeframe", choices=list(TIMEFRAMES), default="Daily")
+    parser.add_argument("--output", default="backtest.csv", help=".csv or .parquet")
+    parser.add_argument("--provider", choices=["yfinance", "synthetic"], default=PRICE_PROVIDER)
+    parser.add_argument("--store", default=PRICE_STORE_PATH, help="price store path")
+    parser.add_argument("--store-only", action="store_true", help="read the price store only, never download")
+    parser.add_argument("--workers", type=int, default=None, help="backtest processes (0 runs inline)")
+    parser.add_argument("--top", type=int, default=10, help="best combinations to print, by Sharpe")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    grid = dict(STRATEGIES[args.strategy]["grid"], **_parse_grid(args.grid))
+    provider = SyntheticProvider() if args.provider == "synthetic" else None
+    store = PriceStore(args.store, provider)
+
+    began = time.perf_counter()
+    data = fetch_universe(store, read_universe(args.universe), args.start, args.end, args.market, args.store_only)
+    data = {ticker: resample_ohlcv(frame, TIMEFRAMES[args.timeframe]) for ticker, frame in data.items()}
+    fetched = time.perf_counter() - began
+
+    began = time.perf_counter()
+    results = sweep(data, args.strategy, grid, args.fee, args.slippage,
+                    PERIODS_PER_YEAR[args.timeframe], args.workers)
+    elapsed = time.perf_counter() - began
+    write_table(results, args.output)
+
+    bars = sum(len(frame) for frame in data.values())
+    logger.info("Fetched %d tickers (%d bars) in %.3fs", len(data), bars, fetched)
+    logger.info("Backtested %d combinations in %.3fs (%.0f combinations/s) -> %s",
+                len(results), elapsed, len(results) / elapsed if elapsed else float("inf"), args.output)
+    if not results.empty:
+        logger.info("%s", results.sort_values("sharpe", ascending=False).head(args.top).to_string(index=False))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+def frame_fingerprint(data):
+    # Content hash of the values, index and column names of a DataFrame
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    digest.update("|".join(map(str, data.columns)).encode())
+    return digest.hexdigest()
+
+
+def make_key(*parts):
+    payload = json.dumps(parts, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class DirectoryBackend:
+    # One pickle file per key. Entries leave the directory when the in-memory LRU evicts them; what
+    # a previous run left behind is swept at startup and every sweep_every writes: expired files
+    # (written more than ttl seconds ago), then the oldest ones over max_entries or max_bytes
+    keep_evicted = False
+
+    def __init__(self, path, max_entries=None, max_bytes=None, ttl=None, sweep_every=64):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sweep_every = sweep_every
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self.sweep()
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.pkl")
+
+    def load(self, key):
+        try:
+            with open(self._file(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def save(self, key, payload):
+        tmp = f"{self._file(key)}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, self._file(key))
+        with self._writes_lock:
+            self._writes += 1
+            sweep = self._writes % self.sweep_every == 0
+        if sweep:
+            self.sweep()
+
+    def sweep(self):
+        now = time.time()
+        files = []
+        for entry in os.scandir(self.path):
+            if not entry.name.endswith(".pkl"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if self.ttl and stat.st_mtime + self.ttl <= now:
+                self._unlink(entry.path)
+            else:
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort(reverse=True)
+        kept = kept_bytes = 0
+        for _, size, path in files:
+            kept += 1
+            kept_bytes += size
+            if (self.max_entries and kept > self.max_entries) or (self.max_bytes and kept_bytes > self.max_bytes):
+                self._unlink(path)
+
+    def _unlink(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def remove(self, key):
+        self._unlink(self._file(key))
+
+
+class SQLiteBackend:
+    # One SQLite table that every app worker on the host opens, so a result computed by any of them
+    # (or by the prefetcher) is a hit in all. Entries outlive evictions from a worker's memory, since
+    # other workers may still want them; the table is trimmed to max_bytes by last access instead.
+    # Sizes are summed every trim_every writes of this process, so the table can briefly run over.
+    # A read only refreshes the access time once it is touch_after seconds old, so hits stay read-only
+    keep_evicted = True
+
+    def __init__(self, path, table="cache", max_bytes=None, trim_every=64, touch_after=300):
+        self.path = path
+        self.table = table
+        self.max_bytes = max_bytes
+        self.trim_every = trim_every
+        self.touch_after = touch_after
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            # value goes last so that summing sizes never reads the blobs
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(key TEXT PRIMARY KEY, size INTEGER, accessed REAL, value BLOB)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, key):
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT value, accessed FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            now = time.time()
+            if row is not None and now - row[1] >= self.touch_after:
+                conn.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+        return row[0] if row else None
+
+    def save(self, key, payload):
+        with self._writes_lock:
+            self._writes += 1
+            check = bool(self.max_bytes) and self._writes % self.trim_every == 0
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?)",
+                (key, len(payload), time.time(), sqlite3.Binary(payload))
+            )
+            if check:
+                self._trim(conn)
+
+    def _trim(self, conn):
+        total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if total > self.max_bytes:
+            # Keep the most recently used entries that fit in max_bytes
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM ("
+                f"SELECT key, SUM(size) OVER (ORDER BY accessed DESC) AS kept FROM {self.table}"
+                ") WHERE kept > ?)",
+                (self.max_bytes,)
+            )
+
+    def remove(self, key):
+        with self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+
+class LRUCache:
+    # Thread-safe LRU bounded by entry count, pickled size and optional TTL, optionally backed by a
+    # persisted tier: a directory (path) or any backend with load/save/remove, such as SQLiteBackend
+    def __init__(self, max_entries=128, max_bytes=None, path=None, ttl=None, backend=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.backend = backend or (DirectoryBackend(path, max_entries, max_bytes, ttl) if path else None)
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "backend_hits": 0}
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _load(self, key):
+        try:
+            payload = self.backend.load(key)
+            if payload is None:
+                return None
+            expires, value = pickle.loads(payload)
+            return value, len(payload), expires
+        except (OSError, sqlite3.Error, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            return None
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            if key in self._entries:
+                value, size, expires = self._entries[key]
+                if expires is None or expires > now:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return value
+                del self._entries[key]
+                self._bytes -= size
+                self.stats["expirations"] += 1
+        loaded = self._load(key) if self.backend else None
+        if loaded is not None:
+            value, size, expires = loaded
+            if expires is None or expires > now:
+                with self._lock:
+                    self._insert(key, value, size, expires)
+                    self.stats["hits"] += 1
+                    self.stats["backend_hits"] += 1
+                return value
+            self.backend.remove(key)
+        with self._lock:
+            self.stats["misses"] += 1
+        return default
+
+    def set(self, key, value):
+        expires = time.time() + self.ttl if self.ttl else None
+        payload = pickle.dumps((expires, value), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._insert(key, value, len(payload), expires)
+        if self.backend:
+            self.backend.save(key, payload)
+
+    def _insert(self, key, value, size, expires):
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size, expires)
+        self._bytes += size
+        while self._entries and (
+            len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            evicted, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.stats["evictions"] += 1
+            if self.backend and not self.backend.keep_evicted and evicted != key:
+                self.backend.remove(evicted)
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+        if self.backend:
+            for key in keys:
+                self.backend.remove(key)
+
+    def info(self):
+        with self._lock:
+            total = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": self.stats["hits"] / total if total else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes
+            }
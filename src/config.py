@@ -1,11 +1,12 @@
 import os
+import threading
 from dotenv import load_dotenv
-from openai import OpenAI
 
 load_dotenv()
 
 # Set LLM
 OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY")
+OPENROUTER_BASE_URL = os.environ.get("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
 MODEL_NAME = 'deepseek/deepseek-chat-v3-0324:free'
 LANGUAGES = {
     "English": "en",
@@ -14,4 +15,77 @@ LANGUAGES = {
     "日本語": "ja"
 }
 
-client = OpenAI(api_key=OPENROUTER_API_KEY, base_url="https://openrouter.ai/api/v1")
+# Display name -> pandas offset applied to the base (daily) series; None keeps the base bars.
+# resample_ohlcv accepts any offset, so an intraday base can be aggregated to e.g. "1h" or "4h" too.
+TIMEFRAMES = {
+    "Daily": None,
+    "Weekly": "W-FRI",
+    "Monthly": "ME"
+}
+
+# Local price store
+PRICE_STORE_PATH = os.environ.get("PRICE_STORE_PATH", os.path.join(".cache", "prices.sqlite"))
+PRICE_PROVIDER = os.environ.get("PRICE_PROVIDER", "yfinance")  # "synthetic" for offline runs
+FETCH_MAX_WORKERS = int(os.environ.get("FETCH_MAX_WORKERS", 8))
+FETCH_BATCH_SIZE = int(os.environ.get("FETCH_BATCH_SIZE", 50))
+PRICE_DTYPE = os.environ.get("PRICE_DTYPE", "float32")  # Bars kept in session state; indicators run in float64
+
+# Indicator result cache
+INDICATOR_CACHE_ENTRIES = int(os.environ.get("INDICATOR_CACHE_ENTRIES", 256))
+INDICATOR_CACHE_MAX_MB = int(os.environ.get("INDICATOR_CACHE_MAX_MB", 256))
+INDICATOR_CACHE_DIR = os.environ.get("INDICATOR_CACHE_DIR")  # Set to persist results across restarts
+
+# Shared tier behind the indicator cache: a SQLite file that every app worker on the host opens, so
+# charts and digests computed by one worker (or the prefetcher) are hits in all of them.
+# Takes the place of INDICATOR_CACHE_DIR when set
+SHARED_CACHE_PATH = os.environ.get("SHARED_CACHE_PATH")
+SHARED_CACHE_MAX_MB = int(os.environ.get("SHARED_CACHE_MAX_MB", 1024))
+
+# Background prefetch: after each market's close, warm the store and the indicator cache for the
+# most requested tickers of the last PREFETCH_WINDOW_DAYS, so their first page load is a hit
+PREFETCH = os.environ.get("PREFETCH", "0") == "1"
+PREFETCH_TOP = int(os.environ.get("PREFETCH_TOP", 20))
+PREFETCH_WINDOW_DAYS = int(os.environ.get("PREFETCH_WINDOW_DAYS", 30))
+PREFETCH_DELAY = int(os.environ.get("PREFETCH_DELAY", 30))  # Minutes after the close, once daily bars are final
+
+# Only build the chart of the ticker being viewed (selector) instead of every tab on each rerun
+LAZY_TABS = os.environ.get("LAZY_TABS", "1") != "0"
+
+# Most points per chart series sent to the browser (about the chart's pixel width); 0 sends every bar
+CHART_MAX_POINTS = int(os.environ.get("CHART_MAX_POINTS", 1500))
+
+# Upper bound for the indicator digest sent to the LLM, in estimated tokens
+DIGEST_TOKEN_BUDGET = int(os.environ.get("DIGEST_TOKEN_BUDGET", 800))
+
+# LLM response cache
+LLM_CACHE_ENTRIES = int(os.environ.get("LLM_CACHE_ENTRIES", 512))
+LLM_CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", 6 * 60 * 60))  # Seconds
+LLM_CACHE_DIR = os.environ.get("LLM_CACHE_DIR", os.path.join(".cache", "llm"))
+
+# Pipeline instrumentation: a sidebar panel with per-stage timings and counters, and memory peaks
+# per stage (tracemalloc, which slows allocation-heavy code noticeably)
+DEBUG_PANEL = os.environ.get("DEBUG_PANEL", "0") == "1"
+PROFILE_MEMORY = os.environ.get("PROFILE_MEMORY", "0") == "1"
+
+# LLM request limits, shared by every session in the process
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 8))
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", 60))  # Seconds per request
+LLM_RETRIES = int(os.environ.get("LLM_RETRIES", 3))  # Attempts when rate limited (HTTP 429)
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    # Built on first use: the OpenAI SDK is the slowest import of the app and many sessions never call it.
+    # Every session then shares this client and its pool of keep-alive connections to the provider
+    global _client
+    with _client_lock:
+        if _client is None:
+            from openai import OpenAI
+            _client = OpenAI(
+                api_key=OPENROUTER_API_KEY,
+                base_url=OPENROUTER_BASE_URL,
+                timeout=LLM_TIMEOUT,
+                max_retries=0  # Rate limits are retried by the caller (LLM_RETRIES)
+            )
+    return _client
@@ -1,32 +1,73 @@
-import yfinance as yf
+import threading
+import weakref
 import pandas as pd
-from datetime import datetime
-import streamlit as st
+from src.cache import frame_fingerprint
+from src.config import PRICE_STORE_PATH, PRICE_PROVIDER, PRICE_DTYPE, FETCH_MAX_WORKERS, FETCH_BATCH_SIZE
+from src.price_store import PriceStore, SyntheticProvider
+from src.profiling import metrics, span
 
-def fetch_stock_data(tickers, start_date, end_date, market="US Stocks"):
+_store = None
+_store_lock = threading.Lock()
+# Sessions asking for the same bars get the same frame object; it lives while any session holds it.
+# Its values are a read-only array, so an in-place write raises instead of changing every session's bars
+# (pandas 2 does not copy on write by default)
+_shared_frames = weakref.WeakValueDictionary()
+
+def get_price_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            provider = SyntheticProvider() if PRICE_PROVIDER == "synthetic" else None
+            _store = PriceStore(PRICE_STORE_PATH, provider, dtype=PRICE_DTYPE)
+            metrics.register("price_store", lambda: dict(_store.stats, hit_rate=_store.hit_rate()))
+    return _store
+
+def _read_only(data):
+    values = data.to_numpy(copy=True)
+    values.flags.writeable = False
+    return pd.DataFrame(values, index=data.index, columns=data.columns, copy=False)
+
+def share_frame(data):
+    key = frame_fingerprint(data)
+    with _store_lock:
+        shared = _shared_frames.get(key)
+        if shared is None:
+            _shared_frames[key] = shared = _read_only(data)
+    return shared
+
+def market_symbol(ticker, market):
+    # Provider symbol of a ticker: Taiwan stocks take the .TW suffix
+    return f"{ticker}.TW" if market == "TW Stocks" else ticker
+
+def fetch_stock_data(tickers, start_date, end_date, market="US Stocks", store=None):
     stock_data = {}
     if not tickers:  # Check if tickers list is empty
         return stock_data
-        
-    for ticker in tickers:
-        try:
-            # Add .TW suffix for Taiwan stocks
-            yf_ticker = f"{ticker}.TW" if market == "TW Stocks" else ticker
-            data = yf.download(
-                yf_ticker,
-                start=start_date,
-                end=end_date,
-                progress=False,
-                multi_level_index=False
-            )
-            if not data.empty:
-                # Flatten multi-index columns if present
-                if isinstance(data.columns, pd.MultiIndex):
-                    data.columns = ['_'.join(col).strip() for col in data.columns.values]
-                stock_data[ticker] = data
-            else:
-                st.warning(f"No data found for {ticker}.")
-        except Exception as e:
-            st.error(f"Error fetching data for {ticker}: {str(e)}")
-    
+
+    store = store or get_price_store()
+    symbols = {ticker: market_symbol(ticker, market) for ticker in tickers}
+    with span("fetch"):
+        frames, errors = store.get_many(
+            list(symbols.values()), start_date, end_date,
+            max_workers=FETCH_MAX_WORKERS,
+            batch_size=FETCH_BATCH_SIZE
+        )
+
+    empty = []
+    failed = []
+    for ticker, symbol in symbols.items():
+        if symbol in errors:
+            failed.append(f"{ticker} ({errors[symbol]})")
+        elif frames[symbol].empty:
+            empty.append(ticker)
+        else:
+            stock_data[ticker] = share_frame(frames[symbol])
+
+    if empty or failed:
+        import streamlit as st  # Only the messages need it, so the headless screener can import this module
+    if empty:
+        st.warning(f"No data found for {', '.join(empty)}.")
+    if failed:
+        st.error(f"Error fetching data for {', '.join(failed)}")
+
     return stock_data
@@ -0,0 +1,99 @@
+import json
+import math
+
+import numpy as np
+
+# Reference lines whose crossings are worth reporting for the lower-panel indicators
+THRESHOLDS = {
+    "RSI": (30, 70),
+    "CCI": (-100, 100),
+    "ROC": (0,)
+}
+
+def estimate_tokens(text):
+    # Rough rule of thumb for English/JSON text with common tokenizers
+    return math.ceil(len(text) / 4)
+
+def _round(value, decimals):
+    if value is None or not np.isfinite(value):
+        return None
+    return round(float(value), decimals)
+
+def _date(index, position):
+    return index[position].strftime("%Y-%m-%d")
+
+def _last_cross(index, a, b):
+    # Most recent bar where series a crossed series (or level) b; NaNs never count as a cross
+    diff = a - b
+    valid = ~np.isnan(diff)
+    sign = np.sign(diff)
+    crossed = valid[1:] & valid[:-1] & (sign[1:] != sign[:-1]) & (sign[1:] != 0)
+    positions = np.flatnonzero(crossed)
+    if not len(positions):
+        return None
+    position = positions[-1] + 1
+    return {"date": _date(index, position), "direction": "up" if sign[position] > 0 else "down",
+            "bars_ago": len(diff) - 1 - int(position)}
+
+def _slope(values, window):
+    # Least-squares slope over the last window valid bars, as % of the latest value per bar
+    values = values[~np.isnan(values)][-window:]
+    if len(values) < 2 or values[-1] == 0:
+        return None
+    slope = np.polyfit(np.arange(len(values)), values, 1)[0]
+    return slope / abs(values[-1]) * 100
+
+def _describe(index, values, recent, slope_window, decimals):
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return None
+    high, low = int(np.nanargmax(values)), int(np.nanargmin(values))
+    entry = {
+        "latest": _round(values[np.flatnonzero(valid)[-1]], decimals),
+        "max": [_round(values[high], decimals), _date(index, high)],
+        "min": [_round(values[low], decimals), _date(index, low)],
+        "slope_pct_per_bar": _round(_slope(values, slope_window), decimals)
+    }
+    if recent:
+        entry["recent"] = [_round(v, decimals) for v in values[-recent:] if not np.isnan(v)]
+    return entry
+
+def build_digest(data, indicator_frame, groups, recent=10, slope_window=20, decimals=2, timeframe=None):
+    # groups: [{"type", "lower", "columns"}], one per indicator spec, in display order
+    index = data.index
+    close = data['Close'].to_numpy(dtype="float64")
+    digest = {
+        "period": [_date(index, 0), _date(index, -1)],
+        "bars": len(data),
+        "recent_bars": recent,
+        "close": _describe(index, close, recent, slope_window, decimals),
+        "indicators": {}
+    }
+    if timeframe:
+        digest["timeframe"] = timeframe  # Bar size, so "per bar" slopes and bars_ago can be read correctly
+    for group in groups:
+        for column in group["columns"]:
+            values = indicator_frame[column].to_numpy(dtype="float64")
+            described = _describe(index, values, recent, slope_window, decimals)
+            if described is None:
+                continue
+            if not group["lower"] and not np.isnan(values[-1]):
+                # Price overlays: where the close sits relative to the line and when it last crossed
+                described["close_vs_line"] = "above" if close[-1] > values[-1] else "below"
+                described["last_close_cross"] = _last_cross(index, close, values)
+            for level in THRESHOLDS.get(group["type"], ()):
+                described[f"last_cross_{level}"] = _last_cross(index, values, np.full(len(values), level))
+            digest["indicators"][column] = described
+        if group["type"] == "MACD" and group["columns"][0] in digest["indicators"]:
+            macd, signal = (indicator_frame[column].to_numpy(dtype="float64") for column in group["columns"])
+            digest["indicators"][group["columns"][0]]["last_signal_cross"] = _last_cross(index, macd, signal)
+    return digest
+
+def encode_digest(data, indicator_frame, groups, token_budget=800, timeframe=None):
+    # Shrink the recent-value windows until the digest fits the budget, then drop them altogether
+    for recent in (20, 10, 5, 3, 0):
+        digest = build_digest(data, indicator_frame, groups, recent=recent, timeframe=timeframe)
+        text = json.dumps(digest, separators=(",", ":"))
+        if estimate_tokens(text) <= token_budget:
+            break
+    return text
@@ -0,0 +1,58 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+def lttb(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the visual shape of (x, y).
+    # The first triangle corner is the previous bucket's mean rather than its selected point, which
+    # lets every bucket be evaluated in one vectorized pass
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    starts, lengths = edges[:-1], np.diff(edges)
+    mean_x = np.add.reduceat(x[:n - 1], starts) / lengths
+    mean_y = np.add.reduceat(y[:n - 1], starts) / lengths
+    # Corners A (before) and C (after) for each bucket, using the end points at the edges
+    ax, ay = np.concatenate(([x[0]], mean_x[:-1])), np.concatenate(([y[0]], mean_y[:-1]))
+    cx, cy = np.concatenate((mean_x[1:], [x[-1]])), np.concatenate((mean_y[1:], [y[-1]]))
+
+    offsets = np.arange(lengths.max())
+    candidates = starts[:, None] + offsets
+    valid = offsets < lengths[:, None]
+    candidates = np.where(valid, candidates, starts[:, None])
+    area = np.abs(
+        (ax - cx)[:, None] * (y[candidates] - ay[:, None])
+        - (ax[:, None] - x[candidates]) * (cy - ay)[:, None]
+    )
+    area[~valid] = -1
+    selected = candidates[np.arange(len(starts)), np.argmax(area, axis=1)]
+    return np.concatenate(([0], selected, [n - 1]))
+
+def downsample_series(series, max_points):
+    # LTTB over the non-NaN points of a datetime-indexed series
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    x = series.index.asi8 if isinstance(series.index, pd.DatetimeIndex) else np.arange(len(series))
+    return series.iloc[lttb(x, series.to_numpy(dtype="float64"), max_points)]
+
+def aggregate_ohlc(data, max_bars):
+    # Merge runs of consecutive bars so at most max_bars candles remain; each keeps its first timestamp
+    if len(data) <= max_bars:
+        return data
+    size = math.ceil(len(data) / max_bars)
+    starts = np.arange(0, len(data), size)
+    ends = np.minimum(starts + size, len(data)) - 1
+    aggregated = {
+        'Open': data['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(data['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(data['Low'].to_numpy(), starts),
+        'Close': data['Close'].to_numpy()[ends]
+    }
+    if 'Volume' in data:
+        aggregated['Volume'] = np.add.reduceat(data['Volume'].to_numpy(), starts)
+    return pd.DataFrame(aggregated, index=data.index[starts])
@@ -1,20 +1,284 @@
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import numpy as np
 import pandas as pd
+import copy
 import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from numpy.lib.stride_tricks import sliding_window_view
+from src.cache import LRUCache, SQLiteBackend, frame_fingerprint, make_key
+from src.config import (
+    INDICATOR_CACHE_ENTRIES, INDICATOR_CACHE_MAX_MB, INDICATOR_CACHE_DIR, DIGEST_TOKEN_BUDGET, CHART_MAX_POINTS,
+    SHARED_CACHE_PATH, SHARED_CACHE_MAX_MB
+)
+from src.digest import encode_digest, estimate_tokens
+from src.downsample import aggregate_ohlc, downsample_series
+from src.profiling import metrics, span
+from src.streaming import STREAMING_INDICATORS
+
+logger = logging.getLogger(__name__)
+
+# Shared by every session in the process; keyed by data content plus normalized indicator specs.
+# With SHARED_CACHE_PATH set, also by every worker process that opens the same SQLite file
+shared_tier = SQLiteBackend(
+    SHARED_CACHE_PATH, "indicators", max_bytes=SHARED_CACHE_MAX_MB * 1024 * 1024
+) if SHARED_CACHE_PATH else None
+indicator_cache = LRUCache(
+    max_entries=INDICATOR_CACHE_ENTRIES,
+    max_bytes=INDICATOR_CACHE_MAX_MB * 1024 * 1024,
+    path=INDICATOR_CACHE_DIR,
+    backend=shared_tier
+)
+metrics.register("indicator_cache", indicator_cache.info)
+
+def calculate_sma(data, period):
+    return data['Close'].rolling(window=period).mean()
+
+def calculate_ema(data, period):
+    return data['Close'].ewm(span=period).mean()
+
+def calculate_bollinger_bands(data, period):
+    sma = data['Close'].rolling(window=period).mean()
+    std = data['Close'].rolling(window=period).std()
+    return sma + (std * 2), sma - (std * 2)
+
+def calculate_vwap(data):
+    return (data['Close'] * data['Volume']).cumsum() / data['Volume'].cumsum()
+
+def calculate_rsi(data, period):
+    delta = data['Close'].diff()
+    # Bars without a close (panel padding before a listing) stay missing instead of counting as 0
+    listed = data['Close'].notna()
+    gain = (delta.where(delta > 0, 0)).where(listed).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).where(listed).rolling(window=period).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+def calculate_macd(data, fast, slow, signal):
+    ema_fast = data['Close'].ewm(span=fast).mean()
+    ema_slow = data['Close'].ewm(span=slow).mean()
+    macd = ema_fast - ema_slow
+    signal_line = macd.ewm(span=signal).mean()
+    return macd, signal_line
+
+def calculate_roc(data, period):
+    return ((data['Close'] - data['Close'].shift(period)) / data['Close'].shift(period)) * 100
+
+def rolling_mean_abs_deviation(values, window, max_block=1 << 22):
+    # Mean absolute deviation of every trailing window, computed on a strided view instead of a
+    # per-window Python callback; blocks keep the temporaries at max_block elements.
+    # 2-D input (time x ticker) is handled for every column at once; windows touching a NaN are NaN
+    values = np.asarray(values, dtype="float64")
+    result = np.full(values.shape, np.nan)
+    if window > len(values):
+        return result
+    windows = sliding_window_view(values, window, axis=0)
+    step = max(1, max_block // (window * (values.size // len(values))))
+    for start in range(0, len(windows), step):
+        block = windows[start:start + step]
+        deviation = np.abs(block - block.mean(axis=-1, keepdims=True)).mean(axis=-1)
+        result[window - 1 + start:window - 1 + start + len(block)] = deviation
+    return result
+
+def calculate_cci(data, period):
+    tp = (data['High'] + data['Low'] + data['Close']) / 3
+    sma = tp.rolling(window=period).mean()
+    mad = rolling_mean_abs_deviation(tp.values, period)
+    mad = pd.DataFrame(mad, index=tp.index, columns=tp.columns) if mad.ndim == 2 else pd.Series(mad, index=tp.index)
+    # A flat window has no deviation to scale by (only rounding noise); leave it undefined
+    return (tp - sma) / (0.015 * mad.where(mad > 1e-12 * sma.abs()))
+
+# Each entry maps an indicator type to its pure calculation, default parameters, whether it is
+# drawn below the price chart, and the (column, legend label) pairs of the series it returns
+INDICATORS = {
+    "SMA": {
+        "func": calculate_sma,
+        "defaults": {"period": 20},
+        "lower": False,
+        "outputs": lambda p: [(f"SMA_{p['period']}", f"SMA({p['period']})")]
+    },
+    "EMA": {
+        "func": calculate_ema,
+        "defaults": {"period": 20},
+        "lower": False,
+        "outputs": lambda p: [(f"EMA_{p['period']}", f"EMA({p['period']})")]
+    },
+    "Bollinger Bands": {
+        "func": calculate_bollinger_bands,
+        "defaults": {"period": 20},
+        "lower": False,
+        "outputs": lambda p: [
+            (f"BB_upper_{p['period']}", f"Upper Band({p['period']})"),
+            (f"BB_lower_{p['period']}", f"Lower Band({p['period']})")
+        ]
+    },
+    "VWAP": {
+        "func": calculate_vwap,
+        "defaults": {},
+        "lower": False,
+        "outputs": lambda p: [("VWAP", "VWAP")]
+    },
+    "RSI": {
+        "func": calculate_rsi,
+        "defaults": {"period": 14},
+        "lower": True,
+        "outputs": lambda p: [(f"RSI_{p['period']}", f"RSI({p['period']})")]
+    },
+    "MACD": {
+        "func": calculate_macd,
+        "defaults": {"fast": 12, "slow": 26, "signal": 9},
+        "lower": True,
+        "outputs": lambda p: [
+            (f"MACD_{p['fast']}_{p['slow']}", f"MACD({p['fast']},{p['slow']})"),
+            (f"MACD_signal_{p['fast']}_{p['slow']}_{p['signal']}", f"Signal({p['signal']})")
+        ]
+    },
+    "ROC": {
+        "func": calculate_roc,
+        "defaults": {"period": 12},
+        "lower": True,
+        "outputs": lambda p: [(f"ROC_{p['period']}", f"ROC({p['period']})")]
+    },
+    "CCI": {
+        "func": calculate_cci,
+        "defaults": {"period": 20},
+        "lower": True,
+        "outputs": lambda p: [(f"CCI_{p['period']}", f"CCI({p['period']})")]
+    }
+}
+
+def normalize_indicators(indicators, indicator_params=None):
+    # Accept both the session-state dicts and the old plain type names, fill in defaults
+    specs = []
+    for indicator in indicators or []:
+        if isinstance(indicator, dict):  # New format with ID
+            indicator_type = indicator["type"]
+            params = indicator.get("params", {})
+        else:  # Old format (string)
+            indicator_type = indicator
+            params = (indicator_params or {}).get(indicator_type, {})
+        if indicator_type not in INDICATORS:
+            continue
+        params = params if isinstance(params, dict) else {}
+        merged = {
+            name: max(1, int(params.get(name, default)))
+            for name, default in INDICATORS[indicator_type]["defaults"].items()
+        }
+        if {"type": indicator_type, "params": merged} not in specs:
+            specs.append({"type": indicator_type, "params": merged})
+    return specs
+
+def compute_indicators(data, specs):
+    # Headless: returns one column per output series, aligned with the OHLCV index. Bars may be
+    # stored as float32; the calculations (VWAP's running sums in particular) run on a float64 copy
+    data = data.astype("float64")
+    columns = {}
+    for spec in specs:
+        entry = INDICATORS[spec["type"]]
+        values = entry["func"](data, **spec["params"])
+        if not isinstance(values, tuple):
+            values = (values,)
+        for (column, _), series in zip(entry["outputs"](spec["params"]), values):
+            columns[column] = series
+    return pd.DataFrame(columns, index=data.index)
+
+class IncrementalIndicators:
+    # Keeps streaming state for one series so appended or revised trailing bars cost O(1) each
+    def __init__(self, specs):
+        self.specs = specs
+        self.columns = []
+        for spec in specs:
+            self.columns += [column for column, _ in INDICATORS[spec["type"]]["outputs"](spec["params"])]
+        self.frame = None
+        self.bars = None  # The float64 bars frame reflects; astype() leaves it unaffected by callers' edits
+        self.streams = None  # Seeded from the bars the first time a later call extends them
+        self.before_last = None  # State as of the second-to-last bar, for a revised last bar
+        self._lock = threading.Lock()
+
+    def _new_streams(self):
+        return [STREAMING_INDICATORS[spec["type"]](**spec["params"]) for spec in self.specs]
+
+    def _push(self, streams, bar):
+        row = []
+        for stream in streams:
+            row.extend(stream.update(bar))
+        return row
+
+    def _prefix_length(self, data):
+        # Number of leading bars of data that the current state already reflects: every bar before the
+        # last known one must be unchanged, and the last known bar is kept only if all its fields match
+        if self.bars is None or len(self.bars) < 2 or len(data) < len(self.bars):
+            return None
+        known = len(self.bars)
+        if not data.columns.equals(self.bars.columns) or not data.index[:known].equals(self.bars.index):
+            return None
+        values, seen = data.to_numpy(), self.bars.to_numpy()
+        if not np.array_equal(values[:known - 1], seen[:-1], equal_nan=True):
+            return None
+        return known if np.array_equal(values[known - 1], seen[-1], equal_nan=True) else known - 1
+
+    def compute(self, data):
+        if data.empty:
+            return compute_indicators(data, self.specs)
+        data = data.astype("float64")  # Streaming state accumulates in float64 whatever the bars are stored as
+        with self._lock:
+            return self._compute(data)
+
+    def _compute(self, data):
+        known = self._prefix_length(data)
+        if known == len(data):
+            return self.frame
+        if known is None:
+            # A new or edited series costs one batch pass, like compute_indicators. Its columns are
+            # already in spec order; selecting only repeats the ones that several specs share
+            self.frame = compute_indicators(data, self.specs)
+            if len(self.frame.columns) != len(self.columns):
+                self.frame = self.frame[self.columns]
+            self.streams = None
+        else:
+            if self.streams is None:
+                self.streams = self._new_streams()
+                for stream in self.streams:
+                    stream.seed(data.iloc[:known])
+            elif known < len(self.frame):
+                # The last bar was revised (e.g. today's bar is still forming): roll back one bar
+                self.streams = self.before_last
+            rows = []
+            for i in range(known, len(data)):
+                if i == len(data) - 1:
+                    self.before_last = copy.deepcopy(self.streams)
+                rows.append(self._push(self.streams, data.iloc[i]))
+            appended = pd.DataFrame(rows, index=data.index[known:], columns=self.columns)
+            self.frame = pd.concat([self.frame.iloc[:known], appended])
+        self.bars = data
+        return self.frame
+
+_incremental = OrderedDict()
+_incremental_lock = threading.Lock()
+
+def compute_indicators_incremental(key, data, specs, max_series=64):
+    # Reuses the streaming state registered under key (e.g. market and ticker) when data extends what it
+    # has seen. The registry lock only covers the lookup; each state serializes its own updates
+    state_key = make_key(key, specs)
+    with _incremental_lock:
+        state = _incremental.pop(state_key, None) or IncrementalIndicators(specs)
+        _incremental[state_key] = state
+        while len(_incremental) > max_series:
+            _incremental.popitem(last=False)
+    return state.compute(data)
+
+def build_figure(data, indicator_frame, specs, ticker="", max_points=None):
+    # max_points caps what is sent to the browser: candles are merged into OHLC buckets and lines are
+    # thinned with LTTB; the computed indicator values themselves stay at full resolution
+    import plotly.graph_objects as go  # Charts are the only plotly users; headless runs never load it
+    from plotly.subplots import make_subplots
+
+    candles = aggregate_ohlc(data, max_points) if max_points else data
 
-def calculate_indicators(data, indicators, indicator_params, ticker=""):
-    # Clear any existing figures
-    go.Figure().data = []
-    go.Figure().layout = {}
-    
     # Check if we have any indicators that go in the lower subplot
-    lower_plot_indicators = ["RSI", "MACD", "ROC", "CCI"]
-    has_lower_plot = False
-    if indicators:  # Check if indicators list is not empty
-        has_lower_plot = any(ind["type"] in lower_plot_indicators for ind in indicators) if isinstance(indicators[0], dict) \
-                        else any(ind in lower_plot_indicators for ind in indicators)
-    
+    has_lower_plot = any(INDICATORS[spec["type"]]["lower"] for spec in specs)
+
     # Create figure with dynamic subplots
     if has_lower_plot:
         fig = make_subplots(
@@ -28,115 +292,34 @@ def calculate_indicators(data, indicators, indicator_params, ticker=""):
             rows=1, cols=1,
             shared_xaxes=True
         )
-    
+
     # Add candlestick to main chart (row 1)
     fig.add_trace(
         go.Candlestick(
-            x=data.index,
-            open=data['Open'],
-            high=data['High'],
-            low=data['Low'],
-            close=data['Close'],
+            x=candles.index,
+            open=candles['Open'],
+            high=candles['High'],
+            low=candles['Low'],
+            close=candles['Close'],
             name="Candlestick"
         ),
         row=1, col=1
     )
-    
-    indicators_summary = {}
-
-    def calculate_rsi(data, window):
-        delta = data['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
-
-    def calculate_macd(data, fast, slow, signal):
-        ema_fast = data['Close'].ewm(span=fast).mean()
-        ema_slow = data['Close'].ewm(span=slow).mean()
-        macd = ema_fast - ema_slow
-        signal_line = macd.ewm(span=signal).mean()
-        return macd, signal_line
-
-    def calculate_roc(data, window):
-        return ((data['Close'] - data['Close'].shift(window)) / data['Close'].shift(window)) * 100
-
-    def calculate_cci(data, window):
-        tp = (data['High'] + data['Low'] + data['Close']) / 3
-        sma = tp.rolling(window=window).mean()
-        mad = tp.rolling(window=window).apply(lambda x: abs(x - x.mean()).mean())
-        return (tp - sma) / (0.015 * mad)
-    
-    def add_indicator(indicator):
-        nonlocal indicators_summary
-        if isinstance(indicator, dict):  # New format with ID
-            indicator_type = indicator["type"]
-            params = indicator["params"]
-        else:  # Old format (string)
-            indicator_type = indicator
-            params = indicator_params.get(indicator_type, {})
-        
-        if indicator_type == "SMA":
-            period = int(params.get("period", 20))
-            sma = data['Close'].rolling(window=max(1, period)).mean()
-            fig.add_trace(go.Scatter(x=data.index, y=sma, mode='lines', name=f'SMA({period})', uid=f'sma_{period}_{ticker}'), row=1, col=1)
-            indicators_summary[f"SMA_{period}"] = sma.values.tolist()
-        elif indicator_type == "EMA":
-            period = int(params.get("period", 20))
-            ema = data['Close'].ewm(span=max(1, period)).mean()
-            fig.add_trace(go.Scatter(x=data.index, y=ema, mode='lines', name=f'EMA({period})'), row=1, col=1)
-            indicators_summary[f"EMA_{period}"] = ema.values.tolist()
-        elif indicator == "Bollinger Bands":
-            period = indicator_params["Bollinger_Bands"]
-            sma = data['Close'].rolling(window=period).mean()
-            std = data['Close'].rolling(window=period).std()
-            upper_band = sma + (std * 2)
-            lower_band = sma - (std * 2)
-            fig.add_trace(go.Scatter(x=data.index, y=upper_band, mode='lines', name=f'Upper Band({period})'), row=1, col=1)
-            fig.add_trace(go.Scatter(x=data.index, y=lower_band, mode='lines', name=f'Lower Band({period})'), row=1, col=1)
-            indicators_summary[f"Bollinger_Bands_{period}"] = {
-                "upper_band": upper_band.values.tolist(),
-                "lower_band": lower_band.values.tolist()
-            }
-        elif indicator == "VWAP":
-            data['VWAP'] = (data['Close'] * data['Volume']).cumsum() / data['Volume'].cumsum()
-            fig.add_trace(go.Scatter(x=data.index, y=data['VWAP'], mode='lines', name='VWAP'), row=1, col=1)
-            indicators_summary["VWAP"] = data['VWAP'].values.tolist()
-        elif indicator_type == "RSI":
-            period = int(params.get("period", 14))
-            rsi = calculate_rsi(data, max(1, period))
-            row = 2 if has_lower_plot else 1
-            fig.add_trace(go.Scatter(x=data.index, y=rsi, mode='lines', name=f'RSI({period})'), row=row, col=1)
-            indicators_summary[f"RSI_{period}"] = rsi.values.tolist()
-        elif indicator_type == "MACD":
-            fast = int(params.get("fast", 12))
-            slow = int(params.get("slow", 26)) 
-            signal = int(params.get("signal", 9))
-            macd, signal_line = calculate_macd(data, fast, slow, signal)
-            row = 2 if has_lower_plot else 1
-            fig.add_trace(go.Scatter(x=data.index, y=macd, mode='lines', name=f'MACD({fast},{slow})'), row=row, col=1)
-            fig.add_trace(go.Scatter(x=data.index, y=signal_line, mode='lines', name=f'Signal({signal})'), row=row, col=1)
-            indicators_summary["MACD"] = {
-                "MACD": macd.values.tolist(),
-                "Signal": signal_line.values.tolist(),
-                "params": {"fast": fast, "slow": slow, "signal": signal}
-            }
-        elif indicator_type == "ROC":
-            period = int(params.get("period", 12))
-            roc = calculate_roc(data, max(1, period))
-            row = 2 if has_lower_plot else 1
-            fig.add_trace(go.Scatter(x=data.index, y=roc, mode='lines', name=f'ROC({period})'), row=row, col=1)
-            indicators_summary[f"ROC_{period}"] = roc.values.tolist()
-        elif indicator_type == "CCI":
-            period = int(params.get("period", 20))
-            cci = calculate_cci(data, period)
-            row = 2 if has_lower_plot else 1
-            fig.add_trace(go.Scatter(x=data.index, y=cci, mode='lines', name=f'CCI({period})'), row=row, col=1)
-            indicators_summary[f"CCI_{period}"] = cci.values.tolist()
-    
-    for ind in indicators:
-        add_indicator(ind)
-    
+
+    drawn = set()
+    for spec in specs:
+        entry = INDICATORS[spec["type"]]
+        row = 2 if entry["lower"] else 1
+        for column, label in entry["outputs"](spec["params"]):
+            if column in drawn:
+                continue
+            drawn.add(column)
+            series = downsample_series(indicator_frame[column], max_points) if max_points else indicator_frame[column]
+            fig.add_trace(
+                go.Scatter(x=series.index, y=series, mode='lines', name=label, uid=f'{column}_{ticker}'),
+                row=row, col=1
+            )
+
     # Update layout
     fig.update_layout(
         xaxis_rangeslider_visible=False,
@@ -145,4 +328,72 @@ def calculate_indicators(data, indicators, indicator_params, ticker=""):
         legend=dict(orientation="h", y=1.1)
     )
     fig.update_xaxes(rangeslider_visible=False, row=2, col=1)
-    return fig, json.dumps(indicators_summary)
+    return fig
+
+def summarize_indicators(indicator_frame):
+    # Full dump of every value, written straight from the arrays by pandas' JSON encoder instead of
+    # going through Python lists; the LLM gets the bounded digest from digest_indicators instead
+    return "{" + ",".join(
+        f"{json.dumps(column)}:{indicator_frame[column].to_json(orient='values', double_precision=15)}"
+        for column in indicator_frame.columns
+    ) + "}"
+
+def digest_indicators(data, indicator_frame, specs, token_budget=DIGEST_TOKEN_BUDGET, timeframe=None):
+    groups = [
+        {
+            "type": spec["type"],
+            "lower": INDICATORS[spec["type"]]["lower"],
+            "columns": [column for column, _ in INDICATORS[spec["type"]]["outputs"](spec["params"])]
+        }
+        for spec in specs
+    ]
+    digest = encode_digest(data, indicator_frame, groups, token_budget, timeframe)
+    if logger.isEnabledFor(logging.INFO):
+        full = summarize_indicators(indicator_frame)
+        logger.info(
+            "Indicator summary: %d chars (~%d tokens) full, %d chars (~%d tokens) digest",
+            len(full), estimate_tokens(full), len(digest), estimate_tokens(digest)
+        )
+    return digest
+
+def _indicator_frame(data, specs, ticker, timeframe, market):
+    with span("indicators.compute"):
+        if ticker:
+            return compute_indicators_incremental((market, ticker, timeframe), data, specs)
+        return compute_indicators(data, specs)
+
+def calculate_summary(data, indicators, indicator_params, ticker="", timeframe="Daily", market=""):
+    # Headless path: the LLM digest only, without building a figure
+    specs = normalize_indicators(indicators, indicator_params)
+    key = make_key("summary", frame_fingerprint(data), specs, ticker, timeframe)
+    summary = indicator_cache.get(key)
+    if summary is None:
+        indicator_frame = _indicator_frame(data, specs, ticker, timeframe, market)
+        with span("indicators.digest"):
+            summary = digest_indicators(data, indicator_frame, specs, timeframe=timeframe)
+        indicator_cache.set(key, summary)
+    return summary
+
+def calculate_indicators(data, indicators, indicator_params, ticker="", timeframe="Daily", market=""):
+    # data holds the bars of the given timeframe (see src/timeframes.py); each timeframe keeps its own state
+    specs = normalize_indicators(indicators, indicator_params)
+    fingerprint = frame_fingerprint(data)
+    key = make_key(fingerprint, specs, ticker, timeframe)
+    started = time.perf_counter()
+    cached = indicator_cache.get(key)
+    if cached is not None:
+        metrics.observe("indicators.warm_hit", time.perf_counter() - started)
+        return cached
+
+    indicator_frame = _indicator_frame(data, specs, ticker, timeframe, market)
+    with span("indicators.figure"):
+        fig = build_figure(data, indicator_frame, specs, ticker, max_points=CHART_MAX_POINTS or None)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Chart for %s: %d bars sent as %d candles, %d bytes", ticker, len(data), len(fig.data[0].x), len(fig.to_json()))
+    with span("indicators.digest"):
+        summary = digest_indicators(data, indicator_frame, specs, timeframe=timeframe)
+    result = (fig, summary)
+    indicator_cache.set(key, result)
+    indicator_cache.set(make_key("summary", fingerprint, specs, ticker, timeframe), summary)
+    metrics.observe("indicators.cold_miss", time.perf_counter() - started)
+    return result
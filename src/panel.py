@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+from src.cache import frame_fingerprint, make_key
+from src.indicators import INDICATORS, indicator_cache
+from src.price_store import OHLCV_COLUMNS
+
+# Relative-strength lookback of about three months, in bars of each timeframe
+LOOKBACK = {"Daily": 63, "Weekly": 13, "Monthly": 3}
+
+
+class Panel:
+    # Many tickers' OHLCV as 2-D (bar x ticker) frames. Column j holds ticker j's own bars,
+    # right-aligned so the last row is every ticker's latest bar: rolling windows then span each
+    # ticker's own trading days whatever its listing date or exchange calendar, and the leading NaN
+    # padding of a shorter history behaves exactly like "not listed yet".
+    def __init__(self, stock_data, columns=OHLCV_COLUMNS):
+        self.tickers = list(stock_data)
+        length = max((len(frame) for frame in stock_data.values()), default=0)
+        fields = {column: np.full((length, len(self.tickers)), np.nan) for column in columns}
+        self.dates = np.full((length, len(self.tickers)), np.datetime64("NaT"), dtype="datetime64[ns]")
+        for j, frame in enumerate(stock_data.values()):
+            rows = slice(length - len(frame), length)
+            self.dates[rows, j] = frame.index.values
+            for column in columns:
+                fields[column][rows, j] = frame[column].to_numpy(dtype="float64")
+        self.fields = {column: pd.DataFrame(values, columns=self.tickers) for column, values in fields.items()}
+
+    # The registry's calculation functions only index data by column, so they accept a Panel as is
+    def __getitem__(self, column):
+        return self.fields[column]
+
+    def __len__(self):
+        return len(self.dates)
+
+    def to_dates(self, values):
+        # Place bar-aligned values on a shared date x ticker grid; NaN where a ticker has no bar
+        valid = ~np.isnat(self.dates)
+        index = np.unique(self.dates[valid])
+        rows = np.searchsorted(index, self.dates[valid])
+        columns = np.nonzero(valid)[1]
+        out = np.full((len(index), len(self.tickers)), np.nan)
+        out[rows, columns] = np.asarray(values, dtype="float64")[valid]
+        return pd.DataFrame(out, index=pd.DatetimeIndex(index, name="Date"), columns=self.tickers)
+
+    def ticker_frame(self, frames, ticker):
+        # One ticker's slice of {column: bar-aligned frame}, indexed by its own dates
+        j = self.tickers.index(ticker)
+        valid = ~np.isnat(self.dates[:, j])
+        index = pd.DatetimeIndex(self.dates[valid, j], name="Date")
+        return pd.DataFrame({column: frame.to_numpy()[valid, j] for column, frame in frames.items()}, index=index)
+
+
+def compute_panel(panel, specs):
+    # Panel counterpart of compute_indicators: {column: bar x ticker frame}, one pass per indicator
+    columns = {}
+    for spec in specs:
+        entry = INDICATORS[spec["type"]]
+        values = entry["func"](panel, **spec["params"])
+        if not isinstance(values, tuple):
+            values = (values,)
+        for (column, _), frame in zip(entry["outputs"](spec["params"]), values):
+            columns[column] = frame
+    return columns
+
+
+def latest_values(frames):
+    # ticker x column table of every ticker's most recent value
+    return pd.DataFrame({column: frame.iloc[-1] for column, frame in frames.items()})
+
+
+def return_correlation(panel, min_periods=20):
+    # Bar-to-bar returns are taken within each ticker before the tickers are lined up by date
+    close = panel["Close"]
+    min_periods = max(3, min(min_periods, len(panel) // 2))
+    return panel.to_dates(close / close.shift(1) - 1).corr(min_periods=min_periods)
+
+
+def relative_strength(panel, lookback=63):
+    # Return over the last lookback bars, against the universe average, ranked best first
+    close = panel["Close"]
+    if len(close) <= lookback:
+        change = pd.Series(np.nan, index=close.columns)
+    else:
+        change = close.iloc[-1] / close.iloc[-1 - lookback] - 1
+    table = pd.DataFrame({
+        "Rank": change.rank(ascending=False, method="min"),
+        f"Return ({lookback} bars) %": change * 100,
+        "vs. Universe %": (change - change.mean()) * 100,
+        "Percentile": change.rank(pct=True) * 100
+    })
+    table.index.name = "Stock"
+    return table.sort_values("Rank").round(2)
+
+
+def cross_section(stock_data, lookback=63):
+    # (relative strength table, return correlation matrix), cached on the content of every frame
+    key = make_key("cross_section", [frame_fingerprint(frame) for frame in stock_data.values()],
+                   list(stock_data), lookback)
+    cached = indicator_cache.get(key)
+    if cached is None:
+        panel = Panel(stock_data, columns=["Close"])
+        cached = (relative_strength(panel, lookback), return_correlation(panel))
+        indicator_cache.set(key, cached)
+    return cached
+
+
+def correlation_figure(correlation):
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Heatmap(
+        z=correlation.values,
+        x=correlation.columns,
+        y=correlation.index,
+        zmin=-1, zmax=1,
+        colorscale="RdBu",
+        text=correlation.round(2).values,
+        texttemplate="%{text}" if len(correlation) <= 20 else None
+    ))
+    fig.update_layout(height=max(300, 30 * len(correlation)), yaxis_autorange="reversed")
+    return fig
@@ -0,0 +1,189 @@
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from src.config import (
+    PRICE_STORE_PATH, FETCH_MAX_WORKERS, FETCH_BATCH_SIZE, PREFETCH_TOP, PREFETCH_WINDOW_DAYS, PREFETCH_DELAY
+)
+from src.data_fetcher import get_price_store, market_symbol
+from src.indicators import calculate_indicators
+from src.profiling import metrics, span
+
+logger = logging.getLogger(__name__)
+
+# (timezone, hour, minute) of the regular session close
+MARKET_CLOSE = {
+    "US Stocks": ("America/New_York", 16, 0),
+    "TW Stocks": ("Asia/Taipei", 13, 30)
+}
+
+# The sidebar's default range (see src/ui.py): the year up to the session's date
+DEFAULT_RANGE_DAYS = 365
+
+
+def next_run(market, now, delay=PREFETCH_DELAY):
+    # First weekday close plus delay minutes after now, in the market's timezone (holidays included)
+    zone, hour, minute = MARKET_CLOSE[market]
+    local = now.astimezone(ZoneInfo(zone))
+    run = local.replace(hour=hour, minute=minute, second=0, microsecond=0) + timedelta(minutes=delay)
+    while run <= local or run.weekday() >= 5:
+        run += timedelta(days=1)
+    return run
+
+
+class RequestLog:
+    # Per-day request counts of (ticker, market), kept next to the bars so every worker adds to the
+    # same totals, and one claim per market and day so only one worker runs each prefetch
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS requests ("
+                "ticker TEXT, market TEXT, day TEXT, hits INTEGER, PRIMARY KEY (ticker, market, day))"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS prefetch_runs (market TEXT, day TEXT, PRIMARY KEY (market, day))")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, tickers, market, day=None):
+        day = day or datetime.now().strftime("%Y-%m-%d")
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO requests VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (ticker, market, day) DO UPDATE SET hits = hits + 1",
+                [(ticker, market, day) for ticker in tickers]
+            )
+
+    def popular(self, market, limit=PREFETCH_TOP, days=PREFETCH_WINDOW_DAYS):
+        since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT ticker FROM requests WHERE market = ? AND day >= ? "
+                "GROUP BY ticker ORDER BY SUM(hits) DESC, ticker LIMIT ?",
+                (market, since, limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def claim(self, market, day):
+        with self._connect() as conn:
+            cursor = conn.execute("INSERT OR IGNORE INTO prefetch_runs VALUES (?, ?)", (market, day))
+        return cursor.rowcount == 1
+
+    def release(self, market, day):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM prefetch_runs WHERE market = ? AND day = ?", (market, day))
+
+
+def warm(market, tickers, settled=None, store=None, today=None):
+    # Fetch and chart each ticker exactly as a new session would: the default range, daily bars and
+    # no indicators selected. Ranges ending today and tomorrow are both warmed, since the sidebar's
+    # default end date is the server's date at the time of the page load
+    store = store or get_price_store()
+    today = today or datetime.now().date()
+    symbols = {ticker: market_symbol(ticker, market) for ticker in tickers}
+    warmed = 0
+    with span("prefetch.warm"):
+        for end in (today, today + timedelta(days=1)):
+            start = end - timedelta(days=DEFAULT_RANGE_DAYS)
+            frames, errors = store.get_many(
+                list(symbols.values()), start, end,
+                max_workers=FETCH_MAX_WORKERS, batch_size=FETCH_BATCH_SIZE, settled=settled
+            )
+            for symbol, error in errors.items():
+                logger.warning("Prefetch of %s failed: %s", symbol, error)
+            for ticker, symbol in symbols.items():
+                if symbol in frames and not frames[symbol].empty:
+                    calculate_indicators(frames[symbol], [], {}, ticker, "Daily", market)
+                    warmed += 1
+    metrics.increment("prefetch_warmed", warmed)
+    return warmed
+
+
+class Prefetcher:
+    # Daemon thread that warms each market's most requested tickers after its close. A run missed
+    # while the app was down is caught up at start if the close was less than a day ago
+    def __init__(self, log, markets=tuple(MARKET_CLOSE), top=PREFETCH_TOP, delay=PREFETCH_DELAY):
+        self.log = log
+        self.markets = markets
+        self.top = top
+        self.delay = delay
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run(self, market, due):
+        # due is the market-local time of the run; bars through its date are final by then. The claim
+        # is taken first so that two workers never warm at once, and given back if the run fails
+        day = due.date()
+        if not self.log.claim(market, day.isoformat()):
+            return 0
+        try:
+            tickers = self.log.popular(market, self.top)
+            logger.info("Prefetching %d %s tickers for %s", len(tickers), market, day)
+            return warm(market, tickers, settled=day + timedelta(days=1))
+        except Exception:
+            logger.exception("Prefetch for %s failed", market)
+            self.log.release(market, day.isoformat())
+            return 0
+
+    def _loop(self):
+        now = datetime.now(timezone.utc)
+        for market in self.markets:
+            due = next_run(market, now - timedelta(days=1), self.delay)
+            if due <= now:
+                self.run(market, due)
+        while not self._stop.is_set():
+            now = datetime.now(timezone.utc)
+            market, due = min(
+                ((market, next_run(market, now, self.delay)) for market in self.markets), key=lambda item: item[1]
+            )
+            # Wake up at least hourly so a suspended host or a clock change does not skew the schedule much
+            while not self._stop.is_set() and datetime.now(timezone.utc) < due:
+                self._stop.wait(min(3600, (due - datetime.now(timezone.utc)).total_seconds()))
+            if not self._stop.is_set():
+                self.run(market, due)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="prefetcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+_log = None
+_prefetcher = None
+_lock = threading.Lock()
+
+
+def get_request_log():
+    global _log
+    with _lock:
+        if _log is None:
+            _log = RequestLog(PRICE_STORE_PATH)
+    return _log
+
+
+def start_prefetcher():
+    # One scheduler per process; the claims keep workers from warming the same close twice
+    global _prefetcher
+    log = get_request_log()
+    with _lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher(log)
+            _prefetcher.start()
+    return _prefetcher
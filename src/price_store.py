@@ -0,0 +1,350 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.utils import chunked, with_retry
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _to_date(value):
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def normalize_ohlcv(data):
+    # Bring provider output to a flat, tz-naive OHLCV frame indexed by "Date"
+    if data is None or data.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], name="Date"), dtype="float64")
+    if isinstance(data.columns, pd.MultiIndex):
+        data = data.copy()
+        data.columns = data.columns.get_level_values(0)
+    data = data[[col for col in OHLCV_COLUMNS if col in data.columns]].astype("float64")
+    index = pd.DatetimeIndex(data.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    data.index = index.rename("Date")
+    return data
+
+
+class PriceProvider:
+    # Providers return raw bars for [start, end) of a single symbol
+    def download(self, symbol, start, end):
+        raise NotImplementedError
+
+    # Providers that support multi-symbol requests override this with a single round trip
+    def download_many(self, symbols, start, end):
+        return {symbol: self.download(symbol, start, end) for symbol in symbols}
+
+    # Dates of the symbol's splits and dividends; adjusted history changes when a new one shows up
+    def actions(self, symbol):
+        return []
+
+
+class YFinanceProvider(PriceProvider):
+    # yfinance is imported on the first download; offline and store-only runs never load it
+    def download(self, symbol, start, end):
+        import yfinance as yf
+        data = yf.download(
+            symbol,
+            start=start,
+            end=end,
+            progress=False,
+            multi_level_index=False
+        )
+        return normalize_ohlcv(data)
+
+    def download_many(self, symbols, start, end):
+        import yfinance as yf
+        data = yf.download(
+            list(symbols),
+            start=start,
+            end=end,
+            progress=False,
+            group_by="ticker",
+            multi_level_index=True
+        )
+        if data is None or data.empty:
+            return {}
+        available = set(data.columns.get_level_values(0))
+        # Symbols share one date index, so drop the rows that only exist for the others
+        return {
+            symbol: normalize_ohlcv(data[symbol].dropna(how="all"))
+            for symbol in symbols if symbol in available
+        }
+
+    def actions(self, symbol):
+        import yfinance as yf
+        actions = yf.Ticker(symbol).actions
+        return [] if actions is None or actions.empty else list(actions.index)
+
+
+class SyntheticProvider(PriceProvider):
+    # Deterministic random-walk bars, used offline and as a stand-in for yfinance
+    epoch = "2000-01-03"
+
+    def __init__(self, latency=0.0, seed=0):
+        self.latency = latency
+        self.seed = seed
+        self.calls = 0
+        # {symbol: [(date, ratio)]}; bars before each date are split-adjusted like yfinance's
+        self.splits = {}
+
+    def _series(self, symbol, end):
+        days = np.arange(np.datetime64(self.epoch), np.datetime64(_to_date(end)), dtype="datetime64[D]")
+        days = pd.DatetimeIndex(days[np.is_busday(days)].astype("datetime64[ns]"), name="Date")
+        # One generator per field keeps a date's bar identical whatever range is requested
+        rngs = [np.random.default_rng([self.seed, zlib.crc32(symbol.encode()), field]) for field in range(4)]
+        close = 50 * np.exp(np.cumsum(rngs[0].normal(0.0003, 0.02, len(days))))
+        spread = np.abs(rngs[1].normal(0, 0.01, len(days))) * close
+        open_ = close * (1 + rngs[2].normal(0, 0.005, len(days)))
+        volume = rngs[3].integers(100_000, 5_000_000, len(days)).astype("float64")
+        data = pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) + spread,
+            "Low": np.minimum(open_, close) - spread,
+            "Close": close,
+            "Volume": volume,
+        }, index=days)
+        for day, ratio in self.splits.get(symbol, []):
+            earlier = data.index < pd.Timestamp(day)
+            data.loc[earlier, ["Open", "High", "Low", "Close"]] /= ratio
+            data.loc[earlier, "Volume"] *= ratio
+        return data
+
+    def download(self, symbol, start, end):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        data = self._series(symbol, end)
+        return data.loc[_to_date(start):].copy()
+
+    def download_many(self, symbols, start, end):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return {symbol: self._series(symbol, end).loc[_to_date(start):].copy() for symbol in symbols}
+
+    def actions(self, symbol):
+        return [day for day, _ in self.splits.get(symbol, [])]
+
+
+class PriceStore:
+    # SQLite-backed bar store that only asks the provider for ranges it has not seen yet.
+    # dtype is what read() returns; float32 halves the memory of frames that are kept around
+    def __init__(self, path, provider=None, dtype="float64"):
+        self.path = path
+        self.provider = provider or YFinanceProvider()
+        self.dtype = dtype
+        self.stats = {"hits": 0, "misses": 0, "bytes_read": 0, "ranges_fetched": 0, "invalidated": 0}
+        self._lock = threading.Lock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._memory_conn = sqlite3.connect(path, check_same_thread=False) if path == ":memory:" else None
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bars ("
+                "symbol TEXT, ts TEXT, open REAL, high REAL, low REAL, close REAL, volume REAL, "
+                "PRIMARY KEY (symbol, ts)) WITHOUT ROWID"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS coverage (symbol TEXT PRIMARY KEY, start TEXT, end TEXT)")
+            # Date of the last download or action check; stored bars carry the adjustments known then
+            conn.execute("CREATE TABLE IF NOT EXISTS adjusted (symbol TEXT PRIMARY KEY, asof TEXT)")
+
+    @contextmanager
+    def _connect(self):
+        if self._memory_conn is not None:
+            with self._memory_conn:
+                yield self._memory_conn
+            return
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def coverage(self, symbol):
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT start, end FROM coverage WHERE symbol = ?", (symbol,)).fetchone()
+        return row
+
+    def missing_ranges(self, symbol, start, end):
+        start, end = _to_date(start), _to_date(end)
+        if end <= start:
+            return []
+        covered = self.coverage(symbol)
+        if covered is None:
+            return [(start, end)]
+        covered_start, covered_end = covered
+        ranges = []
+        # Extend the covered span contiguously so it never has holes
+        if start < covered_start:
+            ranges.append((start, covered_start))
+        if end > covered_end:
+            ranges.append((covered_end, end))
+        return ranges
+
+    def write(self, symbol, data):
+        data = normalize_ohlcv(data)
+        if data.empty:
+            return 0
+        rows = zip(
+            [symbol] * len(data),
+            data.index.strftime("%Y-%m-%d %H:%M:%S"),
+            *(data[col].tolist() if col in data else [None] * len(data) for col in OHLCV_COLUMNS)
+        )
+        with self._lock, self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(data)
+
+    def mark_covered(self, symbol, start, end, settled=None):
+        # Never mark today as covered so the still-forming bar is refreshed on the next request.
+        # settled moves that bound (exclusive), e.g. past today once the market has closed
+        settled = _to_date(settled) if settled is not None else datetime.now().strftime("%Y-%m-%d")
+        start, end = _to_date(start), min(_to_date(end), settled)
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT start, end FROM coverage WHERE symbol = ?", (symbol,)).fetchone()
+            if row is not None:
+                start, end = min(start, row[0]), max(end, row[1])
+            if end > start:
+                conn.execute("INSERT OR REPLACE INTO coverage VALUES (?, ?, ?)", (symbol, start, end))
+
+    def adjusted_asof(self, symbol):
+        # Stores from before the adjusted table fall back to the coverage end
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT asof FROM adjusted WHERE symbol = ?", (symbol,)).fetchone()
+            if row is None:
+                row = conn.execute("SELECT end FROM coverage WHERE symbol = ?", (symbol,)).fetchone()
+        return row[0] if row else None
+
+    def mark_adjusted(self, symbol, asof=None):
+        asof = _to_date(asof) if asof is not None else datetime.now().strftime("%Y-%m-%d")
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO adjusted VALUES (?, ?)", (symbol, asof))
+
+    def invalidate(self, symbol):
+        with self._lock, self._connect() as conn:
+            for table in ("bars", "coverage", "adjusted"):
+                conn.execute(f"DELETE FROM {table} WHERE symbol = ?", (symbol,))
+
+    def _adjusted_since(self, symbol):
+        # True when the provider lists a split or dividend after the stored bars were adjusted,
+        # None when the lookup fails (the bars are kept and checked again on the next gap-fill)
+        asof = self.adjusted_asof(symbol)
+        try:
+            actions = self.provider.actions(symbol)
+        except Exception:
+            return None
+        return any(_to_date(day) > asof for day in actions)
+
+    def read(self, symbol, start, end):
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT ts, open, high, low, close, volume FROM bars "
+                "WHERE symbol = ? AND ts >= ? AND ts < ? ORDER BY ts",
+                (symbol, _to_date(start), _to_date(end))
+            ).fetchall()
+        index = pd.to_datetime([row[0] for row in rows], format="%Y-%m-%d %H:%M:%S")
+        values = np.array([row[1:] for row in rows], dtype=self.dtype).reshape(-1, len(OHLCV_COLUMNS))
+        data = pd.DataFrame(values, columns=OHLCV_COLUMNS, index=pd.DatetimeIndex(index, name="Date"))
+        self.stats["bytes_read"] += int(data.memory_usage(index=True).sum())
+        return data
+
+    def _download_batch(self, symbols, start, end, attempts, backoff):
+        if len(symbols) == 1:
+            download = lambda: {symbols[0]: self.provider.download(symbols[0], start, end)}
+        else:
+            download = lambda: self.provider.download_many(symbols, start, end)
+        return with_retry(download, attempts=attempts, backoff=backoff)
+
+    def get_many(self, symbols, start, end, max_workers=8, batch_size=50, attempts=3, backoff=0.5, settled=None):
+        # Returns ({symbol: frame}, {symbol: exception}); one failing symbol never sinks the rest
+        symbols = list(dict.fromkeys(symbols))
+        missing = {symbol: self.missing_ranges(symbol, start, end) for symbol in symbols}
+        errors = {}
+        received = {symbol: 0 for symbol in symbols}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            # Bars are stored as the provider adjusts them, so a gap-fill first asks whether a split
+            # or dividend has happened since; if so the symbol's history is dropped and fetched again
+            stale = [symbol for symbol in symbols if missing[symbol] and self.coverage(symbol) is not None]
+            checked = dict(zip(stale, pool.map(self._adjusted_since, stale)))
+            for symbol, changed in checked.items():
+                if changed:
+                    self.invalidate(symbol)
+                    self.stats["invalidated"] += 1
+                    missing[symbol] = self.missing_ranges(symbol, start, end)
+
+            pending = {}
+            for symbol in symbols:
+                if missing[symbol]:
+                    self.stats["misses"] += 1
+                    for date_range in missing[symbol]:
+                        pending.setdefault(date_range, []).append(symbol)
+                else:
+                    self.stats["hits"] += 1
+
+            # Symbols missing the same range go out together in one provider request
+            jobs = {
+                pool.submit(self._download_batch, batch, *date_range, attempts, backoff): (date_range, batch)
+                for date_range, group in pending.items()
+                for batch in chunked(group, batch_size)
+            }
+            retry = []
+            for job, (date_range, batch) in jobs.items():
+                try:
+                    frames = job.result()
+                except Exception as e:
+                    if len(batch) == 1:
+                        errors[batch[0]] = e
+                    else:
+                        retry.extend((date_range, [symbol]) for symbol in batch)
+                    continue
+                self.stats["ranges_fetched"] += 1
+                for symbol in batch:
+                    received[symbol] += self.write(symbol, frames.get(symbol))
+
+            # A failed batch falls back to one request per symbol to isolate the culprit
+            jobs = {
+                pool.submit(self._download_batch, batch, *date_range, attempts, backoff): (date_range, batch)
+                for date_range, batch in retry
+            }
+            for job, (date_range, batch) in jobs.items():
+                try:
+                    frames = job.result()
+                except Exception as e:
+                    errors[batch[0]] = e
+                    continue
+                self.stats["ranges_fetched"] += 1
+                received[batch[0]] += self.write(batch[0], frames.get(batch[0]))
+
+        results = {}
+        for symbol in symbols:
+            if symbol in errors:
+                continue
+            # An empty answer for an unknown symbol is more likely a failure than a fact worth caching
+            if received[symbol] or self.coverage(symbol) is not None:
+                self.mark_covered(symbol, start, end, settled)
+            # A failed check leaves the date alone, even when new bars came in
+            if checked.get(symbol) is False or (received[symbol] and checked.get(symbol, True) is not None):
+                self.mark_adjusted(symbol)
+            results[symbol] = self.read(symbol, start, end)
+        return results, errors
+
+    def get(self, symbol, start, end):
+        results, errors = self.get_many([symbol], start, end, max_workers=1)
+        if symbol in errors:
+            raise errors[symbol]
+        return results[symbol]
+
+    def hit_rate(self):
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
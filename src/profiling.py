@@ -0,0 +1,111 @@
+import json
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class Metrics:
+    # Process-wide stage timings (spans), counters and gauges, exportable as JSON or Prometheus text.
+    # With memory tracing on (tracemalloc), spans also record the peak memory allocated inside them.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.spans = {}
+        self.counters = {}
+        self.collectors = {}
+
+    def start_memory_tracing(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def observe(self, name, seconds, memory_peak=None):
+        with self._lock:
+            entry = self.spans.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0})
+            entry["count"] += 1
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+            entry["last"] = seconds
+            if memory_peak is not None:
+                entry["memory_peak"] = max(entry.get("memory_peak", 0), memory_peak)
+
+    @contextmanager
+    def span(self, name):
+        stack = self._local.__dict__.setdefault("stack", [])
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            # tracemalloc keeps a single peak, so the enclosing span banks its own before the reset
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+            stack.append({"start": current, "peak": current})
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            memory_peak = None
+            if tracing:
+                frame = stack.pop()
+                if tracemalloc.is_tracing():
+                    peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+                    memory_peak = peak - frame["start"]
+                    if stack:
+                        stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+            self.observe(name, elapsed, memory_peak)
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def register(self, name, collector):
+        # collector() -> {key: number}, read at export time (e.g. cache or price store stats)
+        self.collectors[name] = collector
+
+    def snapshot(self):
+        with self._lock:
+            spans = {name: dict(entry) for name, entry in self.spans.items()}
+            counters = dict(self.counters)
+        gauges = {}
+        for name, collector in list(self.collectors.items()):
+            gauges[name] = {
+                key: value for key, value in collector().items()
+                if isinstance(value, (int, float)) and not isinstance(value, bool)
+            }
+        return {"spans": spans, "counters": counters, "gauges": gauges}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix="dashboard"):
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name, kind, samples):
+            name = re.sub(r"[^a-zA-Z0-9_]", "_", f"{prefix}_{name}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+
+        spans = snapshot["spans"]
+        metric("span_seconds_total", "counter", [(f'{{span="{n}"}}', e["total"]) for n, e in spans.items()])
+        metric("span_calls_total", "counter", [(f'{{span="{n}"}}', e["count"]) for n, e in spans.items()])
+        metric("span_seconds_max", "gauge", [(f'{{span="{n}"}}', e["max"]) for n, e in spans.items()])
+        metric("span_memory_peak_bytes", "gauge",
+               [(f'{{span="{n}"}}', e["memory_peak"]) for n, e in spans.items() if "memory_peak" in e])
+        for name, value in snapshot["counters"].items():
+            metric(f"{name}_total", "counter", [("", value)])
+        for group, values in snapshot["gauges"].items():
+            for key, value in values.items():
+                metric(f"{group}_{key}", "gauge", [("", value)])
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+
+
+metrics = Metrics()
+span = metrics.span
@@ -0,0 +1,247 @@
+# Headless batch screener: fetch a universe of tickers, compute indicators in worker processes,
+# keep the ones matching the screening rules and write a ranked table.
+# Run from the repository root: python -m src.screener universe.txt --rules rsi_below:30 macd_cross
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.config import PRICE_STORE_PATH, PRICE_PROVIDER, FETCH_MAX_WORKERS, FETCH_BATCH_SIZE
+from src.data_fetcher import market_symbol
+from src.indicators import INDICATORS, compute_indicators, digest_indicators, normalize_indicators
+from src.price_store import PriceStore, SyntheticProvider
+from src.timeframes import TIMEFRAMES, resample_ohlcv
+
+logger = logging.getLogger(__name__)
+
+# Indicators every rule reads from; the columns follow the registry's naming
+SCREEN_INDICATORS = ["RSI", "MACD", "Bollinger Bands"]
+
+
+def _crossed(a, b, within, direction):
+    # Whether series a crossed series b in the last `within` bars, in the given direction
+    diff = a - b
+    sign = np.sign(diff[-(within + 1):])
+    if len(sign) < 2 or np.isnan(sign).any():
+        return False
+    changes = np.flatnonzero(sign[1:] != sign[:-1]) + 1
+    if not len(changes):
+        return False
+    latest = sign[changes[-1]]
+    return latest > 0 if direction == "up" else latest < 0
+
+
+def _rule_rsi_below(row, frame, columns, level="30"):
+    return row[columns["RSI"][0]] < float(level)
+
+
+def _rule_rsi_above(row, frame, columns, level="70"):
+    return row[columns["RSI"][0]] > float(level)
+
+
+def _rule_macd_cross(row, frame, columns, direction="up", within="3"):
+    macd, signal = (frame[column].to_numpy(dtype="float64") for column in columns["MACD"])
+    return _crossed(macd, signal, int(within), direction)
+
+
+def _rule_close_above_bb(row, frame, columns):
+    return row["Close"] > row[columns["Bollinger Bands"][0]]
+
+
+def _rule_close_below_bb(row, frame, columns):
+    return row["Close"] < row[columns["Bollinger Bands"][1]]
+
+
+# Rule name -> check(latest row, indicator frame, indicator columns, *arguments); arguments come
+# from the command line as name:arg1:arg2, e.g. rsi_below:25 or macd_cross:down:5
+RULES = {
+    "rsi_below": _rule_rsi_below,
+    "rsi_above": _rule_rsi_above,
+    "macd_cross": _rule_macd_cross,
+    "close_above_bb": _rule_close_above_bb,
+    "close_below_bb": _rule_close_below_bb
+}
+
+
+def parse_rules(rules):
+    parsed = []
+    for rule in rules:
+        name, *arguments = rule.split(":")
+        if name not in RULES:
+            raise ValueError(f"Unknown rule {name!r}; choose from {', '.join(RULES)}")
+        parsed.append((rule, name, arguments))
+    return parsed
+
+
+def read_universe(path):
+    # One ticker per line (or comma separated); blank lines and # comments are ignored
+    tickers = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            tickers.extend(part.strip().upper() for part in line.split(",") if part.strip())
+    return list(dict.fromkeys(tickers))
+
+
+def screen_ticker(job):
+    # Runs in a worker process: indicators, rules and (for matches) the LLM digest of one ticker
+    ticker, data, specs, rules, match, with_digest, timeframe = job
+    data = resample_ohlcv(data, TIMEFRAMES[timeframe])
+    frame = compute_indicators(data, specs)
+    columns = {
+        spec["type"]: [column for column, _ in INDICATORS[spec["type"]]["outputs"](spec["params"])]
+        for spec in specs
+    }
+    latest = pd.concat([data.iloc[-1], frame.iloc[-1]])
+    matched = [rule for rule, name, arguments in rules if RULES[name](latest, frame, columns, *arguments)]
+    passed = len(matched) == len(rules) if match == "all" else bool(matched)
+    row = {
+        "ticker": ticker,
+        "date": data.index[-1].strftime("%Y-%m-%d"),
+        "close": float(latest["Close"]),
+        "rsi": float(latest[columns["RSI"][0]]),
+        "macd": float(latest[columns["MACD"][0]]),
+        "macd_signal": float(latest[columns["MACD"][1]]),
+        "bb_upper": float(latest[columns["Bollinger Bands"][0]]),
+        "bb_lower": float(latest[columns["Bollinger Bands"][1]]),
+        "matched": ",".join(matched),
+        "score": len(matched)
+    }
+    digest = digest_indicators(data, frame, specs, timeframe=timeframe) if passed and with_digest else None
+    return row, passed, digest
+
+
+def fetch_universe(store, tickers, start, end, market, store_only=False):
+    # Same symbols as the dashboard's fetch_stock_data, without the Streamlit messages
+    symbols = {ticker: market_symbol(ticker, market) for ticker in tickers}
+    if store_only:
+        frames = {symbol: store.read(symbol, start, end) for symbol in symbols.values()}
+        errors = {}
+    else:
+        frames, errors = store.get_many(
+            list(symbols.values()), start, end,
+            max_workers=FETCH_MAX_WORKERS,
+            batch_size=FETCH_BATCH_SIZE
+        )
+    data = {}
+    for ticker, symbol in symbols.items():
+        if symbol in errors:
+            logger.warning("Error fetching %s: %s", ticker, errors[symbol])
+        elif not frames[symbol].empty:
+            data[ticker] = frames[symbol]
+        else:
+            logger.warning("No data found for %s", ticker)
+    return data
+
+
+def run_screen(data, rules, match="all", max_workers=None, chunksize=16, with_digest=False,
+               indicator_params=None, timeframe="Daily"):
+    # Returns (ranked DataFrame of survivors, {ticker: digest}); rows come back in submission order
+    specs = normalize_indicators(SCREEN_INDICATORS, indicator_params)
+    jobs = [(ticker, frame, specs, rules, match, with_digest, timeframe) for ticker, frame in data.items()]
+    if max_workers == 0:
+        rows, digests = _collect(map(screen_ticker, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            rows, digests = _collect(pool.map(screen_ticker, jobs, chunksize=max(1, chunksize)))
+    table = pd.DataFrame(rows, columns=[
+        "ticker", "date", "close", "rsi", "macd", "macd_signal", "bb_upper", "bb_lower", "matched", "score"
+    ])
+    # More rules matched first, then the most oversold
+    table = table.sort_values(["score", "rsi", "ticker"], ascending=[False, True, True], ignore_index=True)
+    table.insert(0, "rank", np.arange(1, len(table) + 1))
+    return table, digests
+
+
+def _collect(results):
+    rows, digests = [], {}
+    for row, passed, digest in results:
+        if not passed:
+            continue
+        rows.append(row)
+        if digest is not None:
+            digests[row["ticker"]] = digest
+    return rows, digests
+
+
+def write_table(table, path):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    if path.endswith(".parquet"):
+        table.to_parquet(path, index=False)
+    else:
+        table.to_csv(path, index=False)
+
+
+def main(argv=None):
+    today = datetime.now().date()
+    parser = argparse.ArgumentParser(description="Screen a universe of tickers on technical indicator rules.")
+    parser.add_argument("universe", help="file with one ticker per line (or comma separated)")
+    parser.add_argument("--rules", nargs="+", default=["rsi_below:30"],
+                        help=f"rule[:args] to apply; one of {', '.join(RULES)}")
+    parser.add_argument("--match", choices=["all", "any"], default="all")
+    parser.add_argument("--market", choices=["US Stocks", "TW Stocks"], default="US Stocks")
+    parser.add_argument("--start", default=str(today - timedelta(days=365)))
+    parser.add_argument("--end", default=str(today))
+    parser.add_argument("--timeframe", choices=list(TIMEFRAMES), default="Daily", help="bars the rules run on")
+    parser.add_argument("--output", default="screen.csv", help=".csv or .parquet")
+    parser.add_argument("--provider", choices=["yfinance", "synthetic"], default=PRICE_PROVIDER)
+    parser.add_argument("--store", default=PRICE_STORE_PATH, help="price store path")
+    parser.add_argument("--store-only", action="store_true", help="read the price store only, never download")
+    parser.add_argument("--workers", type=int, default=None, help="indicator processes (0 runs inline)")
+    parser.add_argument("--chunksize", type=int, default=16, help="tickers per process task")
+    parser.add_argument("--analyze", action="store_true", help="run the LLM analysis on the survivors")
+    parser.add_argument("--language", default="English")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # The per-ticker size report would serialize every full indicator series; keep batch runs quiet
+    logging.getLogger("src.indicators").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    rules = parse_rules(args.rules)
+    tickers = read_universe(args.universe)
+    provider = SyntheticProvider() if args.provider == "synthetic" else None
+    store = PriceStore(args.store, provider)
+    timings = {}
+
+    began = time.perf_counter()
+    data = fetch_universe(store, tickers, args.start, args.end, args.market, args.store_only)
+    timings["fetch"] = time.perf_counter() - began
+
+    began = time.perf_counter()
+    table, digests = run_screen(
+        data, rules, args.match, args.workers, args.chunksize, with_digest=args.analyze, timeframe=args.timeframe
+    )
+    timings["screen"] = time.perf_counter() - began
+
+    if args.analyze and digests:
+        # Imported here so a plain screen never needs the LLM client
+        from src.analysis import analyze_many
+        began = time.perf_counter()
+        results = dict(analyze_many(digests, args.language))
+        table["action"] = table["ticker"].map(lambda t: results.get(t, {}).get("action"))
+        table["justification"] = table["ticker"].map(lambda t: results.get(t, {}).get("justification"))
+        timings["analyze"] = time.perf_counter() - began
+
+    began = time.perf_counter()
+    write_table(table, args.output)
+    timings["write"] = time.perf_counter() - began
+
+    total = sum(timings.values())
+    logger.info("Screened %d tickers (%d with data), %d passed -> %s", len(tickers), len(data), len(table), args.output)
+    for stage, seconds in timings.items():
+        count = len(digests) if stage == "analyze" else len(data) if stage != "fetch" else len(tickers)
+        rate = count / seconds if seconds else float("inf")
+        logger.info("  %-8s %8.3fs %10.1f tickers/s", stage, seconds, rate)
+    logger.info("  %-8s %8.3fs %10.1f tickers/s", "total", total, len(tickers) / total if total else float("inf"))
+    logger.info("  store hit rate %.0f%%", store.hit_rate() * 100)
+    return table
+
+
+if __name__ == "__main__":
+    main()
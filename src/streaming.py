@@ -0,0 +1,236 @@
+import math
+from collections import deque
+
+import numpy as np
+
+# Stateful counterparts of the batch calculations in src/indicators.py. Each class accepts one bar
+# at a time in O(1) (CCI is O(period)) and returns the same values, in the same order, as the
+# registered batch function. seed() rebuilds the state from a history frame in one vectorized pass.
+
+NAN = float("nan")
+
+
+class _Ema:
+    # pandas ewm(span, adjust=True): weighted mean with weights (1 - alpha) ** age
+    def __init__(self, span):
+        self.span = span
+        self.decay = 1 - 2 / (span + 1)
+        self.num = 0.0
+        self.den = 0.0
+
+    def push(self, value):
+        self.num = value + self.decay * self.num
+        self.den = 1 + self.decay * self.den
+        return self.num / self.den
+
+    def seed(self, values):
+        values = np.asarray(values, dtype="float64")
+        if not len(values):
+            return
+        weights = self.decay ** np.arange(len(values) - 1, -1, -1)
+        self.num = float(np.dot(weights, values))
+        self.den = float(weights.sum())
+
+
+class _Window:
+    # Fixed-size window with a running sum and a Welford-style sum of squared deviations
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.nonzero = 0
+        self.run = 0  # Trailing run of identical values, as pandas uses to report exact zero variance
+        self.center = 0.0
+        self.m2 = 0.0
+
+    def push(self, value):
+        if self.values and value == self.values[-1]:
+            self.run += 1
+        else:
+            self.run = 1
+        if len(self.values) == self.size:
+            old = self.values[0]
+            self.total -= old
+            self.nonzero -= old != 0
+            previous = self.center
+            self.center += (value - old) / self.size
+            self.m2 += (value - old) * (value - self.center + old - previous)
+        else:
+            delta = value - self.center
+            self.center += delta / (len(self.values) + 1)
+            self.m2 += delta * (value - self.center)
+        self.values.append(value)
+        self.total += value
+        self.nonzero += value != 0
+        # Running sums drift; snap back to an exact zero once the window holds only zeros
+        if not self.nonzero:
+            self.total = 0.0
+
+    def seed(self, values):
+        self.values = deque((float(v) for v in values[-self.size:]), maxlen=self.size)
+        self.total = math.fsum(self.values)
+        self.nonzero = sum(v != 0 for v in self.values)
+        self.run = 0
+        for v in reversed(self.values):
+            if v != self.values[-1]:
+                break
+            self.run += 1
+        self.center = self.total / len(self.values) if self.values else 0.0
+        self.m2 = math.fsum((v - self.center) ** 2 for v in self.values)
+
+    @property
+    def full(self):
+        return len(self.values) == self.size
+
+    def mean(self):
+        return self.total / self.size if self.full else NAN
+
+    def std(self):
+        if not self.full or self.size < 2:
+            return NAN
+        if self.run >= self.size:
+            return 0.0
+        return math.sqrt(max(self.m2 / (self.size - 1), 0.0))
+
+
+class StreamingSMA:
+    def __init__(self, period):
+        self.window = _Window(period)
+
+    def update(self, bar):
+        self.window.push(bar["Close"])
+        return (self.window.mean(),)
+
+    def seed(self, data):
+        self.window.seed(data["Close"].values)
+
+
+class StreamingEMA:
+    def __init__(self, period):
+        self.ema = _Ema(period)
+
+    def update(self, bar):
+        return (self.ema.push(bar["Close"]),)
+
+    def seed(self, data):
+        self.ema.seed(data["Close"].values)
+
+
+class StreamingBollingerBands:
+    def __init__(self, period):
+        self.window = _Window(period)
+
+    def update(self, bar):
+        self.window.push(bar["Close"])
+        mean, std = self.window.mean(), self.window.std()
+        return mean + std * 2, mean - std * 2
+
+    def seed(self, data):
+        self.window.seed(data["Close"].values)
+
+
+class StreamingVWAP:
+    def __init__(self):
+        self.price_volume = 0.0
+        self.volume = 0.0
+
+    def update(self, bar):
+        self.price_volume += bar["Close"] * bar["Volume"]
+        self.volume += bar["Volume"]
+        return (self.price_volume / self.volume if self.volume else NAN,)
+
+    def seed(self, data):
+        self.price_volume = float((data["Close"] * data["Volume"]).sum())
+        self.volume = float(data["Volume"].sum())
+
+
+class StreamingRSI:
+    # Matches the batch RSI, which averages gains and losses with a simple rolling mean
+    def __init__(self, period):
+        self.gains = _Window(period)
+        self.losses = _Window(period)
+        self.previous = None
+
+    def update(self, bar):
+        close = bar["Close"]
+        delta = 0.0 if self.previous is None else close - self.previous
+        self.previous = close
+        self.gains.push(max(delta, 0.0))
+        self.losses.push(max(-delta, 0.0))
+        if not self.gains.full:
+            return (NAN,)
+        gain, loss = self.gains.mean(), self.losses.mean()
+        if loss == 0:
+            return (100.0 if gain > 0 else NAN,)
+        return (100 - 100 / (1 + gain / loss),)
+
+    def seed(self, data):
+        close = data["Close"].values
+        if not len(close):
+            return
+        delta = np.diff(close, prepend=close[0])
+        self.gains.seed(np.maximum(delta, 0.0))
+        self.losses.seed(np.maximum(-delta, 0.0))
+        self.previous = float(close[-1])
+
+
+class StreamingMACD:
+    def __init__(self, fast, slow, signal):
+        self.fast = _Ema(fast)
+        self.slow = _Ema(slow)
+        self.signal = _Ema(signal)
+
+    def update(self, bar):
+        macd = self.fast.push(bar["Close"]) - self.slow.push(bar["Close"])
+        return macd, self.signal.push(macd)
+
+    def seed(self, data):
+        close = data["Close"]
+        macd = close.ewm(span=self.fast.span).mean() - close.ewm(span=self.slow.span).mean()
+        self.fast.seed(close.values)
+        self.slow.seed(close.values)
+        self.signal.seed(macd.values)
+
+
+class StreamingROC:
+    def __init__(self, period):
+        self.closes = deque(maxlen=period + 1)
+
+    def update(self, bar):
+        self.closes.append(bar["Close"])
+        if len(self.closes) < self.closes.maxlen:
+            return (NAN,)
+        return ((self.closes[-1] - self.closes[0]) / self.closes[0] * 100,)
+
+    def seed(self, data):
+        self.closes.extend(float(v) for v in data["Close"].values[-self.closes.maxlen:])
+
+
+class StreamingCCI:
+    def __init__(self, period):
+        self.window = _Window(period)
+
+    def update(self, bar):
+        tp = (bar["High"] + bar["Low"] + bar["Close"]) / 3
+        self.window.push(tp)
+        if not self.window.full:
+            return (NAN,)
+        mean = self.window.mean()
+        mad = sum(abs(v - mean) for v in self.window.values) / self.window.size
+        return ((tp - mean) / (0.015 * mad) if mad > 1e-12 * abs(mean) else NAN,)
+
+    def seed(self, data):
+        tp = (data["High"] + data["Low"] + data["Close"]) / 3
+        self.window.seed(tp.values)
+
+
+STREAMING_INDICATORS = {
+    "SMA": StreamingSMA,
+    "EMA": StreamingEMA,
+    "Bollinger Bands": StreamingBollingerBands,
+    "VWAP": StreamingVWAP,
+    "RSI": StreamingRSI,
+    "MACD": StreamingMACD,
+    "ROC": StreamingROC,
+    "CCI": StreamingCCI
+}
@@ -0,0 +1,90 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.cache import frame_fingerprint
+from src.config import TIMEFRAMES  # Kept in config so the sidebar can list them without pandas
+
+
+def _bucket_starts(index, rule):
+    # Position of the first base bar in every non-empty bucket of the offset
+    counts = pd.Series(1, index=index).resample(rule).sum().to_numpy()
+    counts = counts[counts > 0]
+    return np.concatenate(([0], np.cumsum(counts)[:-1])).astype("int64")
+
+
+def _aggregate(data, starts):
+    # Each derived bar is labelled with the last base bar it contains, so an unfinished period
+    # shows up at the latest date rather than at a future period end
+    ends = np.append(starts[1:], len(data)) - 1
+    aggregated = {
+        'Open': data['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(data['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(data['Low'].to_numpy(), starts),
+        'Close': data['Close'].to_numpy()[ends]
+    }
+    if 'Volume' in data:
+        aggregated['Volume'] = np.add.reduceat(data['Volume'].to_numpy(), starts)
+    return pd.DataFrame(aggregated, index=data.index[ends])
+
+
+def resample_ohlcv(data, rule):
+    if rule is None or data.empty:
+        return data
+    return _aggregate(data, _bucket_starts(data.index, rule))
+
+
+class ResampledBars:
+    # Derived bars of one base series; appended base bars only recompute the last, still open period
+    def __init__(self, rule):
+        self.rule = rule
+        self.frame = None
+        self.first = None
+        self.tail_start = None  # Base position where the last derived bar begins
+        self.tail_timestamp = None
+        self.closed_fingerprint = None  # Content of the base bars of every closed period
+        self._lock = threading.Lock()
+
+    def compute(self, data):
+        if data.empty:
+            return resample_ohlcv(data, self.rule)
+        with self._lock:
+            return self._compute(data)
+
+    def _compute(self, data):
+        reuse = (
+            self.frame is not None
+            and data.index[0] == self.first
+            and len(data) > self.tail_start
+            and data.index[self.tail_start] == self.tail_timestamp
+            and frame_fingerprint(data.iloc[:self.tail_start]) == self.closed_fingerprint
+        )
+        offset = self.tail_start if reuse else 0
+        starts = _bucket_starts(data.index[offset:], self.rule) + offset
+        tail = _aggregate(data.iloc[offset:], starts - offset)
+        self.frame = pd.concat([self.frame.iloc[:-1], tail]) if reuse else tail
+        self.first = data.index[0]
+        self.tail_start = int(starts[-1])
+        self.tail_timestamp = data.index[self.tail_start]
+        self.closed_fingerprint = frame_fingerprint(data.iloc[:self.tail_start])
+        return self.frame
+
+
+_resampled = OrderedDict()
+_resampled_lock = threading.Lock()
+
+
+def resample_cached(key, data, timeframe, max_series=64):
+    # Reuses the derived bars registered under (key, timeframe) when data extends what they were built from.
+    # The registry lock only covers the lookup; each series serializes its own updates
+    rule = TIMEFRAMES.get(timeframe, timeframe)
+    if rule is None:
+        return data
+    with _resampled_lock:
+        state = _resampled.pop((key, rule), None) or ResampledBars(rule)
+        _resampled[(key, rule)] = state
+        while len(_resampled) > max_series:
+            _resampled.popitem(last=False)
+    return state.compute(data)
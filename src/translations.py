@@ -8,6 +8,7 @@ TRANSLATIONS = {
         "ticker_input": "Enter stock tickers (comma-separated)",
         "start_date": "Start date",
         "end_date": "End date",
+        "timeframe": "Timeframe",
         "indicators": "Technical Indicators",
         "add_indicator": "+ Add Indicator",
         "select_indicator": "Select Indicator",
@@ -28,6 +29,7 @@ TRANSLATIONS = {
         "ticker_input": "輸入股票代碼 (以逗號分隔)",
         "start_date": "開始日期",
         "end_date": "結束日期",
+        "timeframe": "時間週期",
         "indicators": "技術指標",
         "add_indicator": "+ 新增指標",
         "select_indicator": "選擇指標",
@@ -48,6 +50,7 @@ TRANSLATIONS = {
         "ticker_input": "输入股票代码 (以逗号分隔)",
         "start_date": "开始日期",
         "end_date": "结束日期",
+        "timeframe": "时间周期",
         "indicators": "技术指标",
         "add_indicator": "+ 添加指标",
         "select_indicator": "选择指标",
@@ -68,6 +71,7 @@ TRANSLATIONS = {
         "ticker_input": "株式コードを入力 (カンマ区切り)",
         "start_date": "開始日",
         "end_date": "終了日",
+        "timeframe": "時間足",
         "indicators": "テクニカル指標",
         "add_indicator": "+ 指標を追加",
         "select_indicator": "指標を選択",
@@ -1,6 +1,7 @@
 import streamlit as st
 from datetime import datetime, timedelta
 import uuid
+from .config import TIMEFRAMES
 from .translations import TRANSLATIONS
 
 def setup_ui():
@@ -41,6 +42,14 @@ def setup_ui():
     start_date = st.sidebar.date_input(t["start_date"], start_date_default)
     end_date = st.sidebar.date_input(t["end_date"], end_date_default)
 
+    # Bar size; weekly and monthly bars are derived from the daily data, so switching never re-downloads
+    timeframe = st.sidebar.selectbox(
+        t["timeframe"],
+        options=list(TIMEFRAMES),
+        index=0,
+        key="timeframe"
+    )
+
     # Technical indicators selection with add button
     st.sidebar.subheader(t["indicators"])
     
@@ -129,4 +138,4 @@ def setup_ui():
     indicators_list = [ind["type"] for ind in st.session_state.indicators]
     indicator_params = st.session_state.indicator_params
 
-    return tickers, start_date, end_date, indicators_list, indicator_params, language, market
+    return tickers, start_date, end_date, indicators_list, indicator_params, language, market, timeframe
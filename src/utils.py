@@ -0,0 +1,18 @@
+import random
+import time
+
+
+def with_retry(func, attempts=3, backoff=0.5, retry_on=(Exception,)):
+    # Exponential backoff with a little jitter so parallel callers do not retry in lockstep
+    for attempt in range(attempts):
+        try:
+            return func()
+        except retry_on:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random() * 0.1))
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
@@ -0,0 +1,131 @@
+import pandas as pd
+import streamlit as st
+from src.config import LAZY_TABS
+from src.data_fetcher import fetch_stock_data
+from src.analysis import AnalysisStream, analyze_many
+from src.indicators import calculate_indicators, calculate_summary
+from src.panel import LOOKBACK, correlation_figure, cross_section
+from src.prefetch import get_request_log
+from src.profiling import metrics, span
+from src.timeframes import resample_cached
+
+SUMMARY_VIEW = "Overall Summary"
+
+def analysis_key(ticker, timeframe):
+    # Each timeframe has its own analysis, since the LLM sees different bars
+    return f"analysis_{ticker}_{timeframe}"
+
+def render_ticker(ticker, data, indicator_params, language, timeframe, market):
+    # Derived bars and streaming state are kept per market: "2330" is a different series on each
+    bars = resample_cached((market, ticker), data, timeframe)
+    fig, indicator_summary = calculate_indicators(
+        bars, st.session_state.indicators, indicator_params, ticker, timeframe, market
+    )
+    key = analysis_key(ticker, timeframe)
+
+    st.subheader(f"Analysis for {ticker}")
+    with span("render.chart"):
+        st.plotly_chart(fig)
+
+    if st.button(f"Generate AI Analysis for {ticker}", key=f"analyze_{ticker}"):
+        # Justification tokens are shown as the model produces them
+        st.write("**Detailed Justification:**")
+        stream = AnalysisStream(ticker, indicator_summary, language)
+        with st.spinner(f"Generating {language} analysis for {ticker}..."):
+            st.write_stream(stream)
+        st.session_state[key] = stream.result
+    elif key in st.session_state:
+        result = st.session_state[key]
+        justification = result.get("justification", "No justification provided.")
+        st.write("**Detailed Justification:**")
+        st.write(justification)
+
+def render_summary(stock_data, indicator_params, language, timeframe, market):
+    # Built from the stored per-ticker results only; no figures are needed here
+    overall_results = []
+    for ticker in stock_data:
+        if analysis_key(ticker, timeframe) in st.session_state:
+            result = st.session_state[analysis_key(ticker, timeframe)]
+            overall_results.append({"Stock": ticker, "Recommendation": result.get("action", "N/A")})
+        else:
+            overall_results.append({"Stock": ticker, "Recommendation": "Not analyzed"})
+
+    st.subheader("Overall Structured Recommendation")
+    analyze_all = st.button("Analyze all", key="analyze_all")
+    table = st.empty()
+    table.table(pd.DataFrame(overall_results))
+
+    if len(stock_data) > 1:
+        # Cross-sectional views, computed for all tickers at once on the selected timeframe
+        bars = {ticker: resample_cached((market, ticker), data, timeframe) for ticker, data in stock_data.items()}
+        strength, correlation = cross_section(bars, LOOKBACK.get(timeframe, 63))
+        st.subheader("Relative Strength")
+        st.dataframe(strength)
+        st.subheader("Return Correlation")
+        st.plotly_chart(correlation_figure(correlation))
+
+    if analyze_all:
+        summaries = {
+            ticker: calculate_summary(
+                resample_cached((market, ticker), data, timeframe), st.session_state.indicators, indicator_params,
+                ticker, timeframe, market
+            )
+            for ticker, data in stock_data.items()
+        }
+        # Requests run concurrently; each row fills in as soon as its analysis returns
+        rows = {row["Stock"]: row for row in overall_results}
+        with st.spinner(f"Generating {language} analysis for {len(summaries)} stocks..."):
+            for ticker, result in analyze_many(summaries, language):
+                st.session_state[analysis_key(ticker, timeframe)] = result
+                rows[ticker]["Recommendation"] = result.get("action", "N/A")
+                table.table(pd.DataFrame(list(rows.values())))
+        st.rerun()
+
+def render_debug_panel():
+    # Timings accumulate over every rerun of the process; the current rerun is not finished yet
+    snapshot = metrics.snapshot()
+    with st.sidebar.expander("Debug: pipeline metrics"):
+        spans = pd.DataFrame.from_dict(snapshot["spans"], orient="index")
+        if not spans.empty:
+            spans["mean"] = spans["total"] / spans["count"]
+        st.dataframe(spans)
+        st.json({"counters": snapshot["counters"], "gauges": snapshot["gauges"]}, expanded=False)
+        st.download_button("Download JSON", metrics.to_json(), "metrics.json", "application/json")
+        st.download_button("Download Prometheus", metrics.to_prometheus(), "metrics.prom", "text/plain")
+
+def render_page(tickers, start_date, end_date, indicators_list, indicator_params, language, market, timeframe):
+    # Everything below the sidebar; takes the values returned by setup_ui
+    # Fetch the base (daily) bars once per set of inputs; other timeframes are derived from them,
+    # so switching the timeframe (or any other rerun) does not hit the store or the network again
+    fetch_key = (tuple(tickers), str(start_date), str(end_date), market)
+    if st.session_state.get("fetch_key") == fetch_key:
+        stock_data = st.session_state["stock_data"]
+    else:
+        stock_data = fetch_stock_data(tickers, start_date, end_date, market)
+        # Counted once per session and set of inputs; the prefetcher warms the most requested tickers
+        get_request_log().record(list(stock_data), market)
+    
+    if stock_data:
+        st.session_state["stock_data"] = stock_data
+        st.session_state["fetch_key"] = fetch_key
+        st.success("Stock data loaded successfully for: " + ", ".join(stock_data.keys()))
+
+        views = list(stock_data.keys()) + [SUMMARY_VIEW]
+        if LAZY_TABS:
+            # Only the selected view is built and sent to the browser
+            if st.session_state.get("view") not in views:
+                st.session_state["view"] = views[0]
+            view = st.radio("View", views, horizontal=True, key="view", label_visibility="collapsed")
+            if view == SUMMARY_VIEW:
+                render_summary(stock_data, indicator_params, language, timeframe, market)
+            else:
+                render_ticker(view, stock_data[view], indicator_params, language, timeframe, market)
+        else:
+            tabs = st.tabs(views)
+            for i, ticker in enumerate(stock_data):
+                with tabs[i]:  # First tabs are for stock analysis
+                    render_ticker(ticker, stock_data[ticker], indicator_params, language, timeframe, market)
+            with tabs[-1]:  # Last tab is Overall Summary
+                render_summary(stock_data, indicator_params, language, timeframe, market)
+    else:
+        st.info("Please fetch stock data using the sidebar.")
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _random_bars(count, seed):
+    # Random-walk OHLCV on business days; the same seed always gives the same bars
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, count)))
+    open_ = close * np.exp(rng.normal(0, 0.01, count))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.01, count)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.01, count)))
+    volume = rng.integers(1_000, 1_000_000, count).astype("float64")
+    index = pd.bdate_range("2020-01-01", periods=count, name="Date")
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume}, index=index)
+
+
+@pytest.fixture
+def random_bars():
+    return _random_bars
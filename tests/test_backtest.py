@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest import METRICS, run_backtest
+
+FEE, SLIPPAGE, PERIODS = 0.001, 0.0005, 252
+
+
+def reference_backtest(close, entries, exits, cost=FEE + SLIPPAGE, periods_per_year=PERIODS):
+    # Bar-by-bar: the state decided at a bar's close is held over the next bar
+    held, state = [False], False
+    for entry, exit_ in zip(entries[:-1], exits[:-1]):
+        if exit_:
+            state = False
+        elif entry:
+            state = True
+        held.append(state)
+
+    equity, peak, drawdown = [1.0], 1.0, 0.0
+    returns, trades = [], []
+    for i in range(1, len(close)):
+        r = (close[i] / close[i - 1] - 1 if held[i] else 0.0) - (cost if held[i] != held[i - 1] else 0.0)
+        returns.append(r)
+        equity.append(equity[-1] * (1 + r))
+        peak = max(peak, equity[-1])
+        drawdown = max(drawdown, 1 - equity[-1] / peak)
+        if held[i] and not held[i - 1]:
+            trades.append([i - 1, None])
+        elif held[i - 1] and not held[i]:
+            trades[-1][1] = i  # The exit cost is paid on this bar
+    trade_returns = [equity[end if end is not None else -1] / equity[start] - 1 for start, end in trades]
+
+    std = np.std(returns, ddof=1) if len(returns) > 1 else 0.0
+    return {
+        "total_return": equity[-1] - 1,
+        "sharpe": np.mean(returns) / std * np.sqrt(periods_per_year) if std > 0 else np.nan,
+        "max_drawdown": drawdown,
+        "trades": len(trades),
+        "win_rate": sum(r > 0 for r in trade_returns) / len(trades) if trades else np.nan,
+        "exposure": np.mean(held)
+    }
+
+
+def assert_matches_reference(result, close, entries, exits):
+    expected = pd.DataFrame([
+        reference_backtest(close, entries[:, i], exits[:, i]) for i in range(entries.shape[1])
+    ])[METRICS]
+    np.testing.assert_allclose(
+        result[METRICS].to_numpy(dtype="float64"), expected.to_numpy(dtype="float64"),
+        rtol=1e-9, atol=1e-12, equal_nan=True
+    )
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_random_signals_match_reference(seed, random_bars):
+    close = random_bars(300, seed)["Close"].to_numpy()
+    rng = np.random.default_rng(seed)
+    # From sparse to dense signals, so some columns trade often and some barely at all
+    density = np.linspace(0.002, 0.3, 40)
+    entries = rng.random((len(close), 40)) < density
+    exits = rng.random((len(close), 40)) < density
+    result = run_backtest(close, entries, exits, FEE, SLIPPAGE, PERIODS)
+    assert_matches_reference(result, close, entries, exits)
+
+
+def test_same_bar_entry_and_exit(random_bars):
+    close = random_bars(20, 0)["Close"].to_numpy()
+    entries = np.zeros((20, 2), dtype=bool)
+    exits = np.zeros((20, 2), dtype=bool)
+    # Column 0: both signals on one bar stay flat. Column 1: long from bar 3, and a bar with both
+    # signals while long closes the position
+    entries[5, 0] = exits[5, 0] = True
+    entries[3, 1] = True
+    entries[8, 1] = exits[8, 1] = True
+    result = run_backtest(close, entries, exits, FEE, SLIPPAGE, PERIODS)
+    assert_matches_reference(result, close, entries, exits)
+    assert result["trades"].tolist() == [0, 1]
+    assert result.loc[1, "exposure"] == pytest.approx(5 / 20)
+
+
+def test_no_trades(random_bars):
+    close = random_bars(50, 1)["Close"].to_numpy()
+    flat = np.zeros(50, dtype=bool)
+    result = run_backtest(close, flat, flat, FEE, SLIPPAGE, PERIODS)
+    assert result.loc[0, "trades"] == 0
+    assert np.isnan(result.loc[0, "win_rate"]) and np.isnan(result.loc[0, "sharpe"])
+    assert result.loc[0, "total_return"] == 0 and result.loc[0, "max_drawdown"] == 0
@@ -0,0 +1,79 @@
+import sqlite3
+import time
+from contextlib import closing
+
+from src.cache import DirectoryBackend, LRUCache, SQLiteBackend
+
+
+def test_shared_tier_is_seen_by_other_caches(tmp_path):
+    path = str(tmp_path / "shared.sqlite")
+    LRUCache(backend=SQLiteBackend(path)).set("key", {"value": 1})
+    other = LRUCache(backend=SQLiteBackend(path))
+    assert other.get("key") == {"value": 1}
+    assert other.info()["backend_hits"] == 1
+
+
+def test_entries_evicted_from_memory_stay_shared(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "shared.sqlite"))
+    cache = LRUCache(max_entries=1, backend=backend)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.info()["entries"] == 1
+    assert cache.get("a") == 1
+
+
+def test_trim_keeps_recent_entries_within_max_bytes(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "shared.sqlite"), max_bytes=3000, trim_every=4)
+    for i in range(8):
+        backend.save(f"k{i}", b"x" * 1000)
+        time.sleep(0.01)
+    # Trimmed after the 4th and 8th writes only
+    assert [backend.load(f"k{i}") is not None for i in range(8)] == [False] * 5 + [True] * 3
+    backend.save("k8", b"x" * 1000)
+    assert backend.load("k8") is not None and backend.load("k5") is not None
+
+
+def test_directory_tier_is_swept_across_restarts(tmp_path):
+    # Each run leaves its entries on disk; the next one drops what expired or no longer fits
+    for run in range(3):
+        cache = LRUCache(max_entries=5, ttl=0.05, path=str(tmp_path))
+        assert len(list(tmp_path.glob("*.pkl"))) == 0
+        for i in range(5):
+            cache.set(f"run{run}-{i}", i)
+        time.sleep(0.06)
+
+    for run in range(3):
+        cache = LRUCache(max_entries=5, path=str(tmp_path))
+        for i in range(5):
+            cache.set(f"run{run}-{i}", i)
+            time.sleep(0.01)
+    assert len(list(tmp_path.glob("*.pkl"))) == 10
+    cache = LRUCache(max_entries=5, path=str(tmp_path))
+    assert sorted(path.stem for path in tmp_path.glob("*.pkl")) == [f"run2-{i}" for i in range(5)]
+    assert cache.get("run2-4") == 4
+
+
+def test_directory_tier_sweeps_every_few_writes(tmp_path):
+    backend = DirectoryBackend(str(tmp_path), ttl=0.05, sweep_every=4)
+    for i in range(3):
+        backend.save(f"k{i}", b"x")
+    time.sleep(0.06)
+    backend.save("k3", b"x")
+    assert [path.stem for path in tmp_path.glob("*.pkl")] == ["k3"]
+
+
+def test_reads_refresh_access_time_only_when_stale(tmp_path):
+    path = str(tmp_path / "shared.sqlite")
+    backend = SQLiteBackend(path, touch_after=0.05)
+    backend.save("key", b"x")
+
+    def accessed():
+        with closing(sqlite3.connect(path)) as conn:
+            return conn.execute("SELECT accessed FROM cache").fetchone()[0]
+
+    written = accessed()
+    backend.load("key")
+    assert accessed() == written
+    time.sleep(0.06)
+    backend.load("key")
+    assert accessed() > written
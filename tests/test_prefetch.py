@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from src import prefetch
+from src.prefetch import Prefetcher, RequestLog
+
+DUE = datetime(2024, 3, 1, 16, 30)
+
+
+def test_failed_run_releases_its_claim(tmp_path, monkeypatch):
+    log = RequestLog(str(tmp_path / "prices.sqlite"))
+    log.record(["AAA"], "US Stocks")
+    prefetcher = Prefetcher(log, markets=("US Stocks",))
+
+    def fail(*args, **kwargs):
+        raise ConnectionError("provider down")
+    monkeypatch.setattr(prefetch, "warm", fail)
+    assert prefetcher.run("US Stocks", DUE) == 0
+
+    # Another attempt at the same close may run, and a successful run keeps its claim
+    monkeypatch.setattr(prefetch, "warm", lambda market, tickers, settled: len(tickers))
+    assert prefetcher.run("US Stocks", DUE) == 1
+    assert prefetcher.run("US Stocks", DUE) == 0
+    assert not log.claim("US Stocks", DUE.date().isoformat())
@@ -0,0 +1,99 @@
+from datetime import date, timedelta
+
+import pandas as pd
+
+from src.price_store import PriceStore, SyntheticProvider
+
+
+def open_store(tmp_path, provider=None):
+    return PriceStore(str(tmp_path / "prices.sqlite"), provider or SyntheticProvider())
+
+
+def test_gap_fill_downloads_only_missing_dates(tmp_path):
+    store = open_store(tmp_path)
+    first = store.get("AAA", "2024-02-01", "2024-03-01")
+    assert store.provider.calls == 1
+    pd.testing.assert_frame_equal(store.get("AAA", "2024-02-01", "2024-03-01"), first)
+    assert store.provider.calls == 1
+
+    data = store.get("AAA", "2024-01-01", "2024-04-01")
+    # One request before and one after the stored span
+    assert store.provider.calls == 3
+    assert store.coverage("AAA") == ("2024-01-01", "2024-04-01")
+    expected = SyntheticProvider().download("AAA", "2024-01-01", "2024-04-01")
+    pd.testing.assert_frame_equal(data, expected, check_freq=False, check_index_type=False)
+
+
+def test_today_is_never_covered(tmp_path):
+    store = open_store(tmp_path)
+    today = date.today()
+    store.get("AAA", today - timedelta(days=30), today + timedelta(days=1))
+    assert store.coverage("AAA")[1] == today.isoformat()
+    store.get("AAA", today - timedelta(days=30), today + timedelta(days=1))
+    assert store.provider.calls == 2
+
+    # Once the session is settled the day is covered too
+    store.mark_covered("AAA", today - timedelta(days=30), today + timedelta(days=1), settled=today + timedelta(days=1))
+    assert store.coverage("AAA")[1] == (today + timedelta(days=1)).isoformat()
+
+
+class KnownSymbols(SyntheticProvider):
+    def download(self, symbol, start, end):
+        data = super().download(symbol, start, end)
+        return data if symbol.startswith("A") else data.iloc[:0]
+
+
+def test_empty_answer_for_unknown_symbol_is_not_cached(tmp_path):
+    store = open_store(tmp_path, KnownSymbols())
+    assert store.get("ZZZ", "2024-01-01", "2024-02-01").empty
+    assert store.coverage("ZZZ") is None
+    store.get("ZZZ", "2024-01-01", "2024-02-01")
+    assert store.provider.calls == 2
+
+
+def test_new_split_drops_stored_history(tmp_path):
+    provider = SyntheticProvider()
+    store = open_store(tmp_path, provider)
+    # As if these bars had been downloaded on 2024-03-01
+    store.get("AAA", "2024-01-01", "2024-03-01")
+    store.mark_adjusted("AAA", "2024-03-01")
+
+    # A split after the download: the next gap-fill fetches the whole range again, adjusted
+    provider.splits["AAA"] = [("2024-03-15", 2.0)]
+    data = store.get("AAA", "2024-01-01", "2024-04-01")
+    assert store.stats["invalidated"] == 1
+    expected = provider.download("AAA", "2024-01-01", "2024-04-01")
+    pd.testing.assert_frame_equal(data, expected, check_freq=False, check_index_type=False)
+
+    # The split is now reflected in the stored bars, so later gap-fills keep them
+    store.get("AAA", "2023-12-01", "2024-04-01")
+    assert store.stats["invalidated"] == 1
+
+
+class FlakyBatches(SyntheticProvider):
+    # Multi-symbol requests that include BAD fail, and so does BAD on its own
+    def download(self, symbol, start, end):
+        if symbol == "BAD":
+            self.calls += 1
+            raise ConnectionError(symbol)
+        return super().download(symbol, start, end)
+
+    def download_many(self, symbols, start, end):
+        if "BAD" in symbols:
+            self.calls += 1
+            raise ConnectionError(",".join(symbols))
+        return super().download_many(symbols, start, end)
+
+
+def test_failed_batch_falls_back_to_single_requests(tmp_path):
+    store = open_store(tmp_path, FlakyBatches())
+    symbols = ["AAA", "BAD", "CCC", "DDD"]
+    frames, errors = store.get_many(symbols, "2024-01-01", "2024-02-01", batch_size=2, attempts=1)
+    assert set(errors) == {"BAD"}
+    assert sorted(frames) == ["AAA", "CCC", "DDD"]
+    for symbol in frames:
+        assert not frames[symbol].empty
+        assert store.coverage(symbol) is not None
+    assert store.coverage("BAD") is None
+    # Two batches, then AAA and BAD retried one at a time
+    assert store.provider.calls == 4
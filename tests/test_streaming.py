@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.indicators import (
+    INDICATORS, IncrementalIndicators, compute_indicators, compute_indicators_incremental, normalize_indicators
+)
+from src.timeframes import TIMEFRAMES, resample_cached, resample_ohlcv
+
+SPECS = normalize_indicators(list(INDICATORS))
+
+
+def assert_matches_batch(result, data, specs):
+    expected = compute_indicators(data, specs)[result.columns]
+    assert result.index.equals(expected.index)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("kind", list(INDICATORS))
+def test_appends_match_batch(kind, seed, random_bars):
+    specs = [spec for spec in SPECS if spec["type"] == kind]
+    data = random_bars(300, seed)
+    rng = np.random.default_rng(seed + 100)
+    state = IncrementalIndicators(specs)
+    end = int(rng.integers(40, 120))
+    while end <= len(data):
+        assert_matches_batch(state.compute(data.iloc[:end]), data.iloc[:end], specs)
+        end += int(rng.integers(1, 6))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_revised_last_bar(seed, random_bars):
+    data = random_bars(200, seed)
+    state = IncrementalIndicators(SPECS)
+    state.compute(data)
+
+    revised = data.copy()
+    revised.iloc[-1, revised.columns.get_loc("Close")] *= 1.03
+    assert_matches_batch(state.compute(revised), revised, SPECS)
+
+    # Close unchanged: only the range and volume of the forming bar move
+    revised = revised.copy()
+    revised.iloc[-1, revised.columns.get_loc("High")] *= 1.05
+    revised.iloc[-1, revised.columns.get_loc("Volume")] *= 3
+    assert_matches_batch(state.compute(revised), revised, SPECS)
+
+
+def test_revised_earlier_bar_rebuilds(random_bars):
+    data = random_bars(200, 7)
+    state = IncrementalIndicators(SPECS)
+    state.compute(data)
+    revised = data.copy()
+    revised.iloc[100, revised.columns.get_loc("Low")] *= 0.9
+    revised.iloc[100, revised.columns.get_loc("Volume")] *= 10
+    assert_matches_batch(state.compute(revised), revised, SPECS)
+
+
+def test_state_is_kept_per_market(random_bars):
+    us, tw = random_bars(150, 1), random_bars(150, 2)
+    for end in (100, 120, 150):
+        for market, data in (("US Stocks", us), ("TW Stocks", tw)):
+            result = compute_indicators_incremental((market, "2330", "Daily"), data.iloc[:end], SPECS)
+            assert_matches_batch(result, data.iloc[:end], SPECS)
+
+
+def test_weekly_bars_through_resample_cached(random_bars):
+    # Each new day revises the forming weekly bar or opens a new one
+    daily = random_bars(400, 3)
+    key = ("US Stocks", "WEEKLY")
+    for end in range(200, len(daily) + 1):
+        bars = resample_cached(key, daily.iloc[:end], "Weekly")
+        expected_bars = resample_ohlcv(daily.iloc[:end], TIMEFRAMES["Weekly"])
+        pd.testing.assert_frame_equal(bars, expected_bars)
+        result = compute_indicators_incremental((*key, "Weekly"), bars, SPECS)
+        assert_matches_batch(result, expected_bars, SPECS)
+
+
+def test_streams_are_seeded_on_first_extension(random_bars):
+    data = random_bars(200, 4)
+    state = IncrementalIndicators(SPECS)
+    state.compute(data.iloc[:150])
+    assert state.streams is None
+    assert_matches_batch(state.compute(data.iloc[:151]), data.iloc[:151], SPECS)
+    assert state.streams is not None
+
+
+def test_bars_edited_in_place_are_noticed(random_bars):
+    data = random_bars(200, 5)
+    state = IncrementalIndicators(SPECS)
+    state.compute(data)
+    data.iloc[50, data.columns.get_loc("Close")] *= 1.2
+    assert_matches_batch(state.compute(data), data, SPECS)
@@ -0,0 +1,43 @@
+import threading
+
+import pandas as pd
+
+from src.timeframes import TIMEFRAMES, ResampledBars, resample_cached, resample_ohlcv
+
+
+def test_appends_match_pandas(random_bars):
+    daily = random_bars(300, 0)
+    for timeframe in ("Weekly", "Monthly"):
+        state = ResampledBars(TIMEFRAMES[timeframe])
+        for end in range(100, len(daily) + 1, 3):
+            expected = resample_ohlcv(daily.iloc[:end], TIMEFRAMES[timeframe])
+            pd.testing.assert_frame_equal(state.compute(daily.iloc[:end]), expected)
+
+
+def test_edited_closed_period_is_rebuilt(random_bars):
+    daily = random_bars(200, 1)
+    state = ResampledBars(TIMEFRAMES["Weekly"])
+    state.compute(daily)
+    revised = daily.copy()
+    revised.iloc[20, revised.columns.get_loc("High")] *= 1.5
+    pd.testing.assert_frame_equal(state.compute(revised), resample_ohlcv(revised, TIMEFRAMES["Weekly"]))
+
+
+def test_concurrent_series(random_bars):
+    frames = {f"T{i}": random_bars(250, i) for i in range(8)}
+    errors = []
+
+    def worker(ticker, data):
+        try:
+            for end in range(150, len(data) + 1, 10):
+                bars = resample_cached(("US Stocks", ticker), data.iloc[:end], "Weekly")
+                pd.testing.assert_frame_equal(bars, resample_ohlcv(data.iloc[:end], TIMEFRAMES["Weekly"]))
+        except AssertionError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=item) for item in frames.items()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors